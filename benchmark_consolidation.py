@@ -0,0 +1,295 @@
+"""
+Benchmark suite for consolidate_weekly_data
+Generates synthetic data_weekXX_YYYY.csv files (with formatted values) at
+several scales and measures, each in a fresh process:
+
+    full_rebuild      consolidate all weeks from scratch
+    incremental_add   consolidate one new week into an existing store
+    excel_export      write the master Excel file from the store
+
+Wall time and peak memory are written to a JSON results file, so a run can
+be compared with the results of an earlier version (--compare)
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+import consolidate_weekly_data as consolidation
+import master_store
+
+# ============================================
+# CONFIGURATION
+# ============================================
+# Scales as WEEKSxROWS (weeks of rows_per_week rows each)
+# Larger runs, e.g.: 500x1000 100x100000 10x500000
+DEFAULT_SCALES = ["10x1000", "100x1000", "10x50000"]
+
+SCENARIOS = ['full_rebuild', 'incremental_add', 'excel_export']
+
+# Excel sheets hold at most this many rows (header included)
+EXCEL_MAX_ROWS = master_store.EXCEL_MAX_ROWS
+
+RESULTS_FILE = "benchmark_results.json"
+# ============================================
+
+def parse_scale(scale):
+    """'100x5000' -> (100, 5000)"""
+    try:
+        weeks, rows = (int(part) for part in scale.lower().split('x'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Scale must look like WEEKSxROWS (e.g. 100x5000): {scale}")
+    return weeks, rows
+
+def week_of_index(index, start_year=2024):
+    """(year, week) of the index-th synthetic week (52 weeks per year)"""
+    return start_year + index // 52, index % 52 + 1
+
+def generate_weekly_files(folder, weeks, rows, start_year=2024, seed=42, first=0):
+    """
+    Write `weeks` synthetic weekly exports of `rows` rows each (with formatted values)
+    first: index of the first week (to add weeks after an existing set)
+    Returns the paths of the written files
+    """
+    os.makedirs(folder, exist_ok=True)
+    rng = np.random.default_rng(seed + first)
+    paths = []
+    
+    for index in range(first, first + weeks):
+        year, week = week_of_index(index, start_year)
+        
+        clicks = rng.integers(0, 5000, rows)
+        impressions = clicks * rng.integers(5, 50, rows)
+        cost = rng.random(rows) * 2000
+        session = rng.integers(0, 3600, rows)
+        
+        df = pd.DataFrame({
+            'Campaign': pd.Series(rng.integers(0, 200, rows)).map('Campaign {}'.format),
+            'Clicks': pd.Series(clicks).map('{:,}'.format),
+            'Impressions': pd.Series(impressions).map('{:,}'.format),
+            'Cost': pd.Series(cost).map('€{:,.2f}'.format),
+            'CTR': pd.Series(clicks / np.maximum(impressions, 1) * 100).map('{:.2f}%'.format),
+            'Avg. Session': (pd.Series(session // 60).map('{:02d}'.format) + ':'
+                             + pd.Series(session % 60).map('{:02d}'.format)),
+        })
+        path = os.path.join(folder, f"data_week{week:02d}_{year}.csv")
+        df.to_csv(path, index=False)
+        paths.append(path)
+    
+    return paths
+
+def reset_outputs(folder):
+    """Remove everything the consolidation wrote (store, manifest, snapshots, ...), keep the CSV files"""
+    for name in os.listdir(folder):
+        if consolidation.WEEKLY_FILE_PATTERN.match(name):
+            continue
+        path = os.path.join(folder, name)
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        else:
+            os.remove(path)
+
+def measure(folder, scenario, chunk_size=None, trace=False):
+    """Run one scenario on `folder` (in a fresh process); returns measurements"""
+    consolidation.set_data_folder(folder)
+    
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    
+    if scenario == 'excel_export':
+        master_store.export_excel(consolidation.MASTER_STORE, consolidation.MASTER_FILE)
+        success = True
+    else:
+        success = consolidation.consolidate_weekly_data(full_rebuild=(scenario == 'full_rebuild'),
+                                                        export_excel=False, workers=1,
+                                                        chunk_size=chunk_size)
+    
+    result = {
+        'success': success,
+        'seconds': round(time.perf_counter() - start, 3),
+        'peak_arrow_mb': round(pa.default_memory_pool().max_memory() / 1024 ** 2, 1),
+    }
+    
+    if trace:
+        _, peak_python = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result['peak_python_mb'] = round(peak_python / 1024 ** 2, 1)
+    
+    try:
+        import resource
+        # ru_maxrss is in KB on Linux, in bytes on macOS
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        result['peak_rss_mb'] = round(maxrss / (1024 ** 2 if sys.platform == 'darwin' else 1024), 1)
+    except ImportError:
+        pass  # Not available on Windows
+    
+    return result
+
+def run_measurement(folder, scenario, chunk_size=None, trace=False):
+    """Run `measure` in a child process, so the peak memory belongs to this scenario only"""
+    command = [sys.executable, os.path.abspath(__file__), '--measure', folder, '--measure-scenario', scenario]
+    if chunk_size:
+        command += ['--measure-chunk-size', str(chunk_size)]
+    if trace:
+        command.append('--trace-python')
+    output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+    
+    # The measurement is the last line the child prints
+    return json.loads(output.strip().splitlines()[-1])
+
+def run_benchmark(scales, chunk_size=None, scenarios=SCENARIOS, trace=False):
+    """
+    Run the scenarios for each (weeks, rows) scale, in-memory and - with a
+    chunk_size - streaming; returns one result per scale/mode/scenario
+    """
+    results = []
+    work_dir = tempfile.mkdtemp(prefix="consolidation_benchmark_")
+    modes = [('in-memory', None)] + ([('streaming', chunk_size)] if chunk_size else [])
+    
+    try:
+        for weeks, rows in scales:
+            folder = os.path.join(work_dir, f"{weeks}x{rows}")
+            print(f"Generating {weeks} weeks x {rows} rows...")
+            generate_weekly_files(folder, weeks, rows)
+            
+            for mode, mode_chunk_size in modes:
+                # Every mode starts from the same CSV files and an empty store
+                reset_outputs(folder)
+                
+                for scenario in ['full_rebuild', 'excel_export', 'incremental_add']:
+                    if scenario == 'full_rebuild' and scenario not in scenarios:
+                        # The other scenarios need a store
+                        run_measurement(folder, scenario, mode_chunk_size, trace=False)
+                        continue
+                    if scenario not in scenarios:
+                        continue
+                    
+                    # The export reads the store, so it does not depend on the ingest mode
+                    if scenario == 'excel_export' and mode != 'in-memory':
+                        continue
+                    if scenario == 'excel_export' and weeks * rows >= EXCEL_MAX_ROWS:
+                        print(f"  {weeks}x{rows}: excel_export skipped (more rows than an Excel sheet holds)")
+                        continue
+                    
+                    added_files = []
+                    if scenario == 'incremental_add':
+                        added_files = generate_weekly_files(folder, 1, rows, first=weeks)
+                    
+                    print(f"  {weeks}x{rows} {mode}: {scenario}")
+                    result = run_measurement(folder, scenario, mode_chunk_size, trace)
+                    result.update({'scenario': scenario, 'weeks': weeks, 'rows_per_week': rows, 'mode': mode})
+                    results.append(result)
+                    
+                    # Back to `weeks` weeks for the next mode
+                    for path in added_files:
+                        os.remove(path)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    
+    return results
+
+def git_revision():
+    """Short commit hash of this checkout (None outside a git repository)"""
+    try:
+        revision = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                  check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], capture_output=True,
+                               text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+        return revision + ('-dirty' if dirty else '')
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def save_results(results, results_file, chunk_size=None, trace=False):
+    """Write the results with the version and machine they were measured on"""
+    report = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'pyarrow': pa.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'chunk_size': chunk_size,
+        'traced': trace,
+        'results': results,
+    }
+    
+    tmp_file = results_file + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    os.replace(tmp_file, results_file)
+
+def result_key(result):
+    """What makes two results comparable"""
+    return result['scenario'], result['weeks'], result['rows_per_week'], result['mode']
+
+def print_results(results, baseline=None):
+    """Print results as a table (with the change against a baseline results file)"""
+    baseline_results = {result_key(result): result for result in (baseline or {}).get('results', [])}
+    
+    print()
+    header = f"{'scenario':>16} {'weeks':>6} {'rows':>7} {'mode':>10} {'seconds':>8} {'python MB':>10} {'arrow MB':>9} {'RSS MB':>8}"
+    if baseline:
+        header += f" {'time vs. ' + (baseline.get('git_revision') or baseline.get('created', '?')):>18}"
+    print(header)
+    
+    for result in results:
+        line = (f"{result['scenario']:>16} {result['weeks']:>6} {result['rows_per_week']:>7} {result['mode']:>10} "
+                f"{result['seconds']:>8} {result.get('peak_python_mb', '-'):>10} "
+                f"{result['peak_arrow_mb']:>9} {result.get('peak_rss_mb', '-'):>8}")
+        
+        old = baseline_results.get(result_key(result))
+        if old and old['seconds']:
+            line += f" {(result['seconds'] - old['seconds']) / old['seconds']:>+18.0%}"
+        elif baseline:
+            line += f" {'-':>18}"
+        
+        if not result['success']:
+            line += "  ✗ failed"
+        print(line)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark suite for consolidate_weekly_data")
+    parser.add_argument('--scales', type=parse_scale, nargs='+', default=[parse_scale(s) for s in DEFAULT_SCALES],
+                        help="Scales to benchmark as WEEKSxROWS, e.g. 10x1000 100x10000")
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=SCENARIOS,
+                        help="Scenarios to run (default: all)")
+    parser.add_argument('--chunk-size', type=int, default=10000,
+                        help="Chunk size for streaming mode (0 = only in-memory)")
+    parser.add_argument('--trace-python', dest='trace', action='store_true',
+                        help="Also trace peak Python allocations (much slower, timings are not comparable)")
+    parser.add_argument('--output', default=RESULTS_FILE, help="JSON file for the results")
+    parser.add_argument('--compare', metavar='RESULTS_FILE', help="Earlier results file to compare with")
+    parser.add_argument('--measure', metavar='FOLDER', help=argparse.SUPPRESS)
+    parser.add_argument('--measure-scenario', choices=SCENARIOS, default='full_rebuild', help=argparse.SUPPRESS)
+    parser.add_argument('--measure-chunk-size', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.measure:
+        # Child process: one measurement, printed as JSON
+        print(json.dumps(measure(args.measure, args.measure_scenario, args.measure_chunk_size, args.trace)))
+    else:
+        baseline = None
+        if args.compare:
+            with open(args.compare, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+            if baseline.get('traced') != args.trace:
+                print("Note: baseline was measured with a different --trace-python setting, timings differ")
+        
+        results = run_benchmark(args.scales, args.chunk_size or None, args.scenarios, args.trace)
+        save_results(results, args.output, args.chunk_size or None, args.trace)
+        print_results(results, baseline)
+        print(f"\n✓ Results saved: {args.output}")
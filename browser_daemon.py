@@ -0,0 +1,327 @@
+"""
+Warm browser daemon: one logged-in Chrome with the dashboard already loaded
+Scheduled runs send export jobs to the daemon over a local socket instead of
+starting Chrome, opening the dashboard and checking the login every time; a
+job only selects the date range and exports:
+
+    python browser_daemon.py                   # start the daemon (keep it running)
+    python browser_daemon.py --export          # previous week, via the daemon
+    python browser_daemon.py --export --start 2025-40 --end 2025-45
+    python browser_daemon.py --health
+    python browser_daemon.py --stop
+
+A health check runs every HEALTH_INTERVAL seconds (and before each job): if
+Chrome has crashed or the session was logged out, the browser is relaunched.
+Each client is served on its own thread, so --health answers right away
+(status 'busy') while a job is running
+"""
+
+import os
+import sys
+import time
+import secrets
+import logging
+import argparse
+import threading
+from datetime import date
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Listener, Client
+
+from selenium.common.exceptions import WebDriverException
+
+import debug_artifacts
+import phase_metrics
+import looker_download
+from page_waits import is_login_page
+
+# ============================================
+# CONFIGURATION
+# ============================================
+# Local address of the daemon (only reachable from this machine)
+DAEMON_ADDRESS = ("127.0.0.1", 6011)
+
+# Shared secret of daemon and clients: a random key, created by the first daemon
+# start, readable by its owner only (clients must run as the same user)
+DAEMON_KEY_FILE = os.path.join(os.path.expanduser("~"), ".looker_daemon_key")
+
+# Seconds between health checks of the idle browser
+HEALTH_INTERVAL = 300
+
+# Seconds a client waits for a job (backfills take longer)
+CLIENT_TIMEOUT = 1800
+# ============================================
+
+def load_authkey(create=False):
+    """
+    Shared secret from DAEMON_KEY_FILE
+    create: generate a random key (owner-only file) if there is none yet
+    """
+    if create and not os.path.exists(DAEMON_KEY_FILE):
+        # Created with mode 0600 - never readable by others, not even briefly
+        fd = os.open(DAEMON_KEY_FILE, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            f.write(secrets.token_hex(32))
+        logging.info(f"Daemon key created: {DAEMON_KEY_FILE}")
+    
+    # Clients can send anything the daemon unpickles: a key others can read is no key
+    if os.name == 'posix' and os.stat(DAEMON_KEY_FILE).st_mode & 0o077:
+        raise PermissionError(f"{DAEMON_KEY_FILE} is readable by other users (chmod 600 it)")
+    with open(DAEMON_KEY_FILE, 'r', encoding='utf-8') as f:
+        return f.read().strip().encode()
+
+class BrowserDaemon:
+    """Owns one browser; jobs and relaunches take turns through a lock"""
+
+    def __init__(self, authkey):
+        self.authkey = authkey
+        self.driver = None
+        self.lock = threading.Lock()
+        self.job = None  # Description of the running job
+        self.started = time.time()
+        self.launches = 0
+        self.jobs_done = 0
+        self.jobs_failed = 0
+        self.running = True
+
+    def launch(self):
+        """(Re)start Chrome and load the dashboard"""
+        self.close()
+        logging.info("Daemon: starting Chrome browser...")
+        self.driver = looker_download.setup_chrome_driver()
+        self.launches += 1
+        looker_download.open_dashboard(self.driver)
+
+    def close(self):
+        """Quit the browser (if any)"""
+        if self.driver:
+            looker_download.quit_driver(self.driver)
+            self.driver = None
+
+    def status(self):
+        """'ok', 'logged_out' or 'down' - without changing anything"""
+        if not self.driver:
+            return 'down'
+        try:
+            if is_login_page(self.driver):
+                return 'logged_out'
+            self.driver.execute_script("return document.readyState")
+        except WebDriverException:
+            return 'down'
+        return 'ok'
+
+    def ensure_browser(self):
+        """Relaunch the browser if it crashed or was logged out; returns the status afterwards"""
+        status = self.status()
+        if status != 'ok':
+            logging.warning(f"Daemon: browser {status}, relaunching")
+            try:
+                self.launch()
+            except Exception as e:
+                logging.error(f"Daemon: could not relaunch browser: {e}")
+            status = self.status()
+        return status
+
+    def health(self):
+        """Health report for clients (never waits for a running job)"""
+        if self.lock.acquire(blocking=False):
+            try:
+                status = self.status()
+            finally:
+                self.lock.release()
+        else:
+            # The browser belongs to the job until it is done
+            status = 'busy'
+        return {
+            'ok': status in ('ok', 'busy'),
+            'status': status,
+            'job': self.job,
+            'report': looker_download.LOOKER_URL,
+            'uptime_seconds': round(time.time() - self.started),
+            'launches': self.launches,
+            'jobs_done': self.jobs_done,
+            'jobs_failed': self.jobs_failed,
+        }
+
+    def export(self, sundays, retries=1, consolidate=True):
+        """Export the weeks starting on `sundays` in the loaded dashboard"""
+        exported = []
+        failed = []
+        changed_weeks = 0
+        
+        for sunday in sundays:
+            week_num, year = looker_download.get_week_of(sunday)
+            path = None
+            for attempt in range(1, retries + 2):
+                if self.ensure_browser() != 'ok':
+                    break
+                try:
+                    # Strict: the dashboard still shows the previous job's dates
+                    path, changed = looker_download.export_week(self.driver, sunday, strict=True)
+                    changed_weeks += changed
+                    debug_artifacts.clear()
+                    break
+                except Exception as e:
+                    logging.warning(f"Daemon: week {week_num}/{year} failed (attempt {attempt}/{retries + 1}): {e}")
+                    debug_artifacts.flush(f"daemon week {week_num}/{year}, attempt {attempt}")
+                    # Next attempt from a freshly loaded dashboard
+                    try:
+                        looker_download.open_dashboard(self.driver)
+                    except Exception as reload_error:
+                        logging.warning(f"Daemon: could not reload dashboard: {reload_error}")
+            
+            if path:
+                exported.append(path)
+            else:
+                failed.append(f"{week_num}/{year}")
+        
+        if changed_weeks and consolidate:
+            looker_download.run_consolidation()
+        
+        return {'ok': not failed, 'files': exported, 'changed_weeks': changed_weeks, 'failed': failed}
+
+    def handle(self, message):
+        """Answer one client message"""
+        command = message.get('command')
+        if command == 'health':
+            return self.health()
+        if command == 'stop':
+            self.running = False
+            return {'ok': True}
+        if command != 'export':
+            return {'ok': False, 'error': f"Unknown command: {command}"}
+        
+        sundays = [date.fromisoformat(day) for day in message.get('sundays') or []]
+        sundays = sundays or [looker_download.get_last_week_sunday()]
+        logging.info(f"Daemon: export job for {len(sundays)} week(s)")
+        
+        with self.lock:
+            self.job = f"export of {len(sundays)} week(s) since {time.strftime('%H:%M:%S')}"
+            phase_metrics.start_run('daemon', looker_download.OUTPUT_FOLDER)
+            result = {'ok': False}
+            try:
+                result = self.export(sundays, message.get('retries', 1), message.get('consolidate', True))
+            finally:
+                phase_metrics.finish_run(result['ok'])
+                self.job = None
+            
+            if result['ok']:
+                self.jobs_done += 1
+            else:
+                self.jobs_failed += 1
+        return result
+
+    def watch(self):
+        """Background thread: keep the idle browser healthy (and logged in)"""
+        while self.running:
+            time.sleep(HEALTH_INTERVAL)
+            # A running job checks the browser itself
+            if not self.lock.acquire(blocking=False):
+                continue
+            try:
+                if self.running:
+                    self.ensure_browser()
+            finally:
+                self.lock.release()
+
+def serve_client(daemon, connection):
+    """Client thread: answer one message, then close the connection"""
+    with connection:
+        try:
+            message = connection.recv()
+            try:
+                reply = daemon.handle(message)
+            except Exception as e:
+                logging.error(f"Daemon: job failed: {e}", exc_info=True)
+                reply = {'ok': False, 'error': str(e)}
+            connection.send(reply)
+        except (EOFError, OSError) as e:
+            logging.warning(f"Daemon: client connection failed: {e}")
+        
+        if not daemon.running:
+            # 'stop': wake up the listener waiting for the next client
+            try:
+                Client(DAEMON_ADDRESS, authkey=daemon.authkey).close()
+            except OSError:
+                pass
+
+def serve():
+    """Run the daemon until a client sends 'stop'"""
+    daemon = BrowserDaemon(load_authkey(create=True))
+    daemon.launch()
+    threading.Thread(target=daemon.watch, name="daemon-health", daemon=True).start()
+    
+    with Listener(DAEMON_ADDRESS, authkey=daemon.authkey) as listener:
+        logging.info(f"=== Browser daemon listening on {DAEMON_ADDRESS[0]}:{DAEMON_ADDRESS[1]} ===")
+        try:
+            while daemon.running:
+                try:
+                    connection = listener.accept()
+                except (EOFError, OSError, AuthenticationError) as e:
+                    logging.warning(f"Daemon: client connection failed: {e}")
+                    continue
+                if not daemon.running:
+                    connection.close()
+                    break
+                threading.Thread(target=serve_client, args=(daemon, connection), name="daemon-client").start()
+        except KeyboardInterrupt:
+            logging.info("Daemon: interrupted")
+        finally:
+            daemon.running = False
+            with daemon.lock:
+                daemon.close()
+    
+    logging.info("=== Browser daemon stopped ===")
+
+def request(message, timeout=CLIENT_TIMEOUT):
+    """Send one message to the running daemon and return its reply"""
+    with Client(DAEMON_ADDRESS, authkey=load_authkey()) as connection:
+        connection.send(message)
+        if not connection.poll(timeout):
+            raise TimeoutError(f"No reply from the browser daemon within {timeout}s")
+        return connection.recv()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Warm browser daemon for Looker Studio exports")
+    parser.add_argument('--export', action='store_true', help="Send an export job to the running daemon")
+    parser.add_argument('--start', type=looker_download.parse_week, metavar='YYYY-WW',
+                        help="Export job: first week (default: previous week only)")
+    parser.add_argument('--end', type=looker_download.parse_week, metavar='YYYY-WW',
+                        help="Export job: last week (default: previous week)")
+    parser.add_argument('--retries', type=int, default=1, help="Export job: retries per failed week")
+    parser.add_argument('--no-consolidate', action='store_true', help="Export job: skip the file combination")
+    parser.add_argument('--health', action='store_true', help="Print the daemon's health")
+    parser.add_argument('--stop', action='store_true', help="Stop the running daemon")
+    parser.add_argument('--lean', action='store_true', help="Daemon: headless Chrome (needs a logged-in profile)")
+    args = parser.parse_args()
+    
+    if not (args.export or args.health or args.stop):
+        looker_download.LEAN_MODE = args.lean
+        serve()
+        sys.exit(0)
+    
+    if args.health:
+        message = {'command': 'health'}
+    elif args.stop:
+        message = {'command': 'stop'}
+    else:
+        sundays = None
+        if args.start:
+            sundays = [sunday.isoformat() for sunday in looker_download.weeks_in_range(
+                args.start, args.end or looker_download.get_last_week_sunday())]
+        message = {'command': 'export', 'sundays': sundays, 'retries': args.retries,
+                   'consolidate': not args.no_consolidate}
+    
+    try:
+        reply = request(message)
+    except (ConnectionRefusedError, TimeoutError, FileNotFoundError, PermissionError) as e:
+        print(f"\n✗ Browser daemon not reachable: {e}")
+        sys.exit(1)
+    
+    for key, value in reply.items():
+        print(f"  {key}: {value}")
+    if reply.get('ok'):
+        print("\n✓ Done")
+        sys.exit(0)
+    else:
+        print("\n✗ Failed - check log file for details")
+        sys.exit(1)
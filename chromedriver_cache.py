@@ -0,0 +1,256 @@
+"""
+Chromedriver matching the installed Chrome, cached per Chrome build
+The driver for Chrome 142.0.7444.162 lives in <cache dir>/142.0.7444.162/ and
+is used without any network access for as long as that Chrome is installed.
+Only a new Chrome build triggers a download:
+
+- the Chrome for Testing metadata is fetched with one pooled HTTP session and
+  a conditional request (ETag / Last-Modified), so an unchanged file is not
+  downloaded again
+- the zip is streamed to disk and the driver is streamed out of it
+- a mirror (local directory or URL with the Chrome for Testing layout
+  <version>/<platform>/chromedriver-<platform>.zip) replaces the download
+  on offline hosts
+
+Supports win64/win32, linux64 and mac-x64/mac-arm64
+"""
+
+import os
+import re
+import sys
+import json
+import shutil
+import logging
+import zipfile
+import platform
+import subprocess
+
+import requests
+from requests.adapters import HTTPAdapter
+
+METADATA_URL = "https://googlechromelabs.github.io/chrome-for-testing/latest-versions-per-milestone-with-downloads.json"
+METADATA_FILE = "latest-versions-per-milestone-with-downloads.json"
+
+# Chrome executables tried for the version on Linux/macOS
+CHROME_BINARIES = ["google-chrome", "google-chrome-stable", "chromium", "chromium-browser",
+                   "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome"]
+
+# One session (connection pool) for metadata and driver downloads
+_session = None
+
+def get_session():
+    """Pooled HTTP session, created on first use"""
+    global _session
+    if _session is None:
+        _session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=4, max_retries=2)
+        _session.mount("https://", adapter)
+        _session.mount("http://", adapter)  # Mirror in the local network
+    return _session
+
+def get_platform():
+    """Chrome for Testing platform name of this machine"""
+    if sys.platform.startswith('win'):
+        return 'win64' if platform.machine().endswith('64') else 'win32'
+    if sys.platform == 'darwin':
+        return 'mac-arm64' if platform.machine() == 'arm64' else 'mac-x64'
+    return 'linux64'
+
+def driver_filename():
+    """chromedriver.exe on Windows, chromedriver elsewhere"""
+    return 'chromedriver.exe' if sys.platform.startswith('win') else 'chromedriver'
+
+def get_chrome_version():
+    """Installed Chrome build, e.g. '142.0.7444.162' (registry on Windows, --version elsewhere)"""
+    if sys.platform.startswith('win'):
+        try:
+            import winreg
+            key = winreg.OpenKey(winreg.HKEY_CURRENT_USER, r"Software\Google\Chrome\BLBeacon")
+            version, _ = winreg.QueryValueEx(key, "version")
+            winreg.CloseKey(key)
+            return version
+        except OSError:
+            return None
+    
+    for binary in CHROME_BINARIES:
+        try:
+            output = subprocess.run([binary, '--version'], capture_output=True, text=True, timeout=10).stdout
+        except (OSError, subprocess.TimeoutExpired):
+            continue
+        match = re.search(r'\d+\.\d+\.\d+\.\d+', output)
+        if match:
+            return match.group(0)
+    return None
+
+def version_key(version):
+    """'142.0.7444.162' -> (142, 0, 7444, 162), for sorting"""
+    return tuple(int(part) for part in version.split('.') if part.isdigit())
+
+def cached_driver(cache_dir, chrome_version):
+    """Path of the cached driver for this Chrome build, or None"""
+    path = os.path.join(cache_dir, chrome_version, driver_filename())
+    return path if os.path.exists(path) else None
+
+def newest_cached_driver(cache_dir, major_version):
+    """Newest cached driver of the same Chrome major version (used when offline), or None"""
+    if not os.path.isdir(cache_dir):
+        return None
+    builds = [name for name in os.listdir(cache_dir)
+              if name.split('.')[0] == major_version and cached_driver(cache_dir, name)]
+    if not builds:
+        return None
+    return cached_driver(cache_dir, max(builds, key=version_key))
+
+def fetch_metadata(cache_dir, url=METADATA_URL):
+    """
+    Chrome for Testing metadata, via a conditional request: the copy in cache_dir
+    is reused when the server answers 304 (or cannot be reached)
+    """
+    metadata_file = os.path.join(cache_dir, METADATA_FILE)
+    headers_file = metadata_file + '.headers'
+    
+    cached_headers = {}
+    if os.path.exists(metadata_file) and os.path.exists(headers_file):
+        with open(headers_file, 'r', encoding='utf-8') as f:
+            cached_headers = json.load(f)
+    
+    request_headers = {}
+    if cached_headers.get('url') == url:
+        if cached_headers.get('etag'):
+            request_headers['If-None-Match'] = cached_headers['etag']
+        if cached_headers.get('last_modified'):
+            request_headers['If-Modified-Since'] = cached_headers['last_modified']
+    
+    try:
+        response = get_session().get(url, headers=request_headers, timeout=15)
+        if response.status_code == 304:
+            logging.info("Chromedriver metadata unchanged (304), using cached copy")
+        else:
+            response.raise_for_status()
+            # Per-process temp files: several workers may refresh at once
+            tmp_file = f"{metadata_file}.{os.getpid()}.tmp"
+            with open(tmp_file, 'wb') as f:
+                f.write(response.content)
+            os.replace(tmp_file, metadata_file)
+            tmp_file = f"{headers_file}.{os.getpid()}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump({'url': url, 'etag': response.headers.get('ETag'),
+                           'last_modified': response.headers.get('Last-Modified')}, f)
+            os.replace(tmp_file, headers_file)
+    except requests.RequestException as e:
+        if not os.path.exists(metadata_file):
+            raise
+        logging.warning(f"Could not refresh chromedriver metadata, using cached copy: {e}")
+    
+    with open(metadata_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def driver_version_from_metadata(metadata, major_version, platform_name):
+    """(driver version, download URL) for a Chrome major version, or (None, None)"""
+    milestone = metadata.get('milestones', {}).get(major_version)
+    if not milestone:
+        return None, None
+    for download in milestone['downloads'].get('chromedriver', []):
+        if download['platform'] == platform_name:
+            return milestone['version'], download['url']
+    return None, None
+
+def driver_version_from_mirror_dir(mirror, chrome_version, platform_name):
+    """Version folder in a local mirror: the exact Chrome build, else the newest of its major version"""
+    zip_name = f"chromedriver-{platform_name}.zip"
+    major_version = chrome_version.split('.')[0]
+    versions = [name for name in os.listdir(mirror)
+                if name.split('.')[0] == major_version
+                and os.path.exists(os.path.join(mirror, name, platform_name, zip_name))]
+    if not versions:
+        return None
+    return chrome_version if chrome_version in versions else max(versions, key=version_key)
+
+def download_zip(url, target):
+    """Stream a zip to the file `target` (never held in memory as a whole)"""
+    with get_session().get(url, stream=True, timeout=60) as response:
+        response.raise_for_status()
+        with open(target, 'wb') as f:
+            for chunk in response.iter_content(chunk_size=1024 * 1024):
+                f.write(chunk)
+
+def extract_driver(zip_path, target):
+    """Stream the chromedriver executable out of the zip to `target` (executable)"""
+    name = driver_filename()
+    with zipfile.ZipFile(zip_path) as zip_file:
+        member = next((info for info in zip_file.infolist() if os.path.basename(info.filename) == name), None)
+        if member is None:
+            raise FileNotFoundError(f"No {name} in {zip_path}")
+        
+        tmp_file = f"{target}.{os.getpid()}.tmp"  # Several workers may install at once
+        with zip_file.open(member) as source, open(tmp_file, 'wb') as f:
+            shutil.copyfileobj(source, f, 1024 * 1024)
+    
+    os.chmod(tmp_file, 0o755)
+    os.replace(tmp_file, target)
+
+def get_chromedriver(cache_dir, mirror=None):
+    """
+    Path of a chromedriver for the installed Chrome (downloaded only for a new Chrome build)
+    mirror: local directory or base URL with the Chrome for Testing layout (None = official download)
+    Returns None if no matching driver can be found
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    
+    chrome_version = get_chrome_version()
+    if not chrome_version:
+        logging.error("Cannot determine Chrome version")
+        return None
+    logging.info(f"Chrome version: {chrome_version}")
+    
+    driver_path = cached_driver(cache_dir, chrome_version)
+    if driver_path:
+        logging.info(f"Using cached chromedriver: {driver_path}")
+        return driver_path
+    
+    major_version = chrome_version.split('.')[0]
+    platform_name = get_platform()
+    zip_name = f"chromedriver-{platform_name}.zip"
+    
+    try:
+        if mirror and os.path.isdir(mirror):
+            driver_version = driver_version_from_mirror_dir(mirror, chrome_version, platform_name)
+            source = driver_version and os.path.join(mirror, driver_version, platform_name, zip_name)
+        elif mirror:
+            base_url = mirror.rstrip('/')
+            driver_version, _ = driver_version_from_metadata(fetch_metadata(cache_dir, f"{base_url}/{METADATA_FILE}"),
+                                                             major_version, platform_name)
+            source = driver_version and f"{base_url}/{driver_version}/{platform_name}/{zip_name}"
+        else:
+            driver_version, source = driver_version_from_metadata(fetch_metadata(cache_dir),
+                                                                  major_version, platform_name)
+        
+        if not source:
+            logging.error(f"No {platform_name} chromedriver for Chrome {major_version}"
+                          + (f" in mirror {mirror}" if mirror else ""))
+            return None
+        
+        logging.info(f"Installing chromedriver {driver_version} from: {source}")
+        build_dir = os.path.join(cache_dir, chrome_version)
+        os.makedirs(build_dir, exist_ok=True)
+        driver_path = os.path.join(build_dir, driver_filename())
+        if os.path.exists(source):
+            # Local mirror: extract straight from the mirror's zip
+            extract_driver(source, driver_path)
+        else:
+            zip_path = os.path.join(build_dir, f"{zip_name}.{os.getpid()}")
+            download_zip(source, zip_path)
+            extract_driver(zip_path, driver_path)
+            os.remove(zip_path)
+        
+        logging.info(f"Chromedriver installed: {driver_path}")
+        return driver_path
+    
+    except Exception as e:
+        # Offline: a driver of the same major version usually still works
+        driver_path = newest_cached_driver(cache_dir, major_version)
+        if driver_path:
+            logging.warning(f"Could not install chromedriver ({e}), using {driver_path}")
+            return driver_path
+        logging.error(f"Error downloading chromedriver: {e}")
+        return None
@@ -72,6 +72,7 @@ DATE_FILTER_WAIT_TIME = 20
 # ============================================
 
 # These are just reference values for setting up Task Scheduler
+# (scheduler.py runs the exports itself: see SCHEDULES there, e.g. '0 9 * * 1' = Monday 09:00)
 # Day of week to run (0 = Monday, 1 = Tuesday, etc.)
 SCHEDULE_DAY = 0  # Monday
 
@@ -4,10 +4,23 @@ With week number column
 """
 
 import os
+import re
+import json
+import argparse
 import pandas as pd
 import glob
 from datetime import datetime
 import logging
+from functools import partial
+from itertools import islice
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import master_store
+import phase_metrics
+import rollups
+import snapshots
+import typed_ingest
 
 # ============================================
 # CONFIGURATION
@@ -15,27 +28,334 @@ import logging
 WEEKLY_DATA_FOLDER = r"C:\path\to\your\weekly\data\folder"
 MASTER_FILE = os.path.join(WEEKLY_DATA_FOLDER, "master_data_all_weeks.xlsx")
 LOG_FILE = os.path.join(WEEKLY_DATA_FOLDER, "consolidate_log.txt")
+
+# Columnar master store (Parquet, one partition per Year/Week)
+MASTER_STORE = os.path.join(WEEKLY_DATA_FOLDER, "master_store")
+
+# Also export the store to MASTER_FILE (Excel) after each consolidation
+# Excel is slow to write and limited to ~1M rows - set to False for large histories
+EXPORT_EXCEL = True
+
+# Number of worker processes for parsing CSV files (1 = no parallelism)
+# Useful for a full rebuild or a backfill of many weeks
+MAX_WORKERS = 1
+
+# Streaming mode: read each CSV in chunks of this many rows and write them
+# straight to the master store, so memory stays flat however many weeks exist
+# None = read each file at once
+CHUNK_SIZE = None
+
+# Typed ingest: convert formatted values ("Keep value formatting") such as
+# 1,234.56 / €12.30 / 45.2% / 00:01:23 to numeric columns
+TYPED_INGEST = True
+
+# Cached column types, inferred once per column (edit to override a kind)
+SCHEMA_FILE = os.path.join(WEEKLY_DATA_FOLDER, "column_schema.json")
+
+# Number format used in the export (follows the locale of the report)
+THOUSANDS_SEPARATOR = ","
+DECIMAL_SEPARATOR = "."
+
+# Number of rows per file used to infer the type of a new column
+SCHEMA_SAMPLE_ROWS = 10000
+
+# Materialized monthly/quarterly rollups, kept next to the master store
+# Only the months/quarters of new or changed weeks are recomputed
+ROLLUPS = True
+ROLLUP_FOLDER = os.path.join(WEEKLY_DATA_FOLDER, "rollups")
+
+# Extra columns to group the rollups by (e.g. ["Campaign"]), empty = totals only
+ROLLUP_DIMENSIONS = []
+
+# Ingest manifest: remembers which weekly files are already in the master store
+MANIFEST_FILE = os.path.join(WEEKLY_DATA_FOLDER, "ingest_manifest.json")
+
+# Snapshots of the master store (only changed weeks take extra space)
+SNAPSHOT_FOLDER = os.path.join(WEEKLY_DATA_FOLDER, "snapshots")
+
+# Number of snapshots to keep (older ones are pruned)
+SNAPSHOT_RETENTION = 10
 # ============================================
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(LOG_FILE, encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
+# Weekly file names as written by looker_download.py: data_week45_2025.csv
+WEEKLY_FILE_PATTERN = re.compile(r"^data_week(\d{2})_(\d{4})\.csv$")
+
+def setup_logging(log_file=None):
+    """Setup logging to log_file (default LOG_FILE) and the console (no-op if logging is already configured)"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler(log_file or LOG_FILE, encoding='utf-8'),
+            logging.StreamHandler()
+        ]
+    )
+
+def set_data_folder(folder):
+    """Point the consolidation (and all its output files) at another data folder"""
+    global WEEKLY_DATA_FOLDER, MASTER_FILE, LOG_FILE, MASTER_STORE, MANIFEST_FILE, SNAPSHOT_FOLDER, SCHEMA_FILE
+    global ROLLUP_FOLDER
+    WEEKLY_DATA_FOLDER = folder
+    MASTER_FILE = os.path.join(folder, "master_data_all_weeks.xlsx")
+    LOG_FILE = os.path.join(folder, "consolidate_log.txt")
+    MASTER_STORE = os.path.join(folder, "master_store")
+    MANIFEST_FILE = os.path.join(folder, "ingest_manifest.json")
+    SNAPSHOT_FOLDER = os.path.join(folder, "snapshots")
+    SCHEMA_FILE = os.path.join(folder, "column_schema.json")
+    ROLLUP_FOLDER = os.path.join(folder, "rollups")
+
+def get_week_from_filename(csv_file):
+    """Extract (year, week) from a filename like data_week45_2025.csv"""
+    filename = os.path.basename(csv_file)
+    match = WEEKLY_FILE_PATTERN.match(filename)
+    if not match:
+        raise ValueError(f"Unexpected file name (expected data_weekXX_YYYY.csv): {filename}")
+    
+    week_str, year_str = match.groups()  # "45", "2025"
+    
+    return int(year_str), int(week_str)
+
+def build_week_index(folder):
+    """
+    Index the weekly CSV files in a folder: [(year, week, path)], oldest week first
+    (chronological, so data_week01_2026 comes after data_week45_2025)
+    Files that do not match data_weekXX_YYYY.csv are reported and skipped
+    """
+    week_index = []
+    for csv_file in glob.glob(os.path.join(folder, "data_week*.csv")):
+        match = WEEKLY_FILE_PATTERN.match(os.path.basename(csv_file))
+        if not match:
+            logging.warning(f"Skipping file with unexpected name (expected data_weekXX_YYYY.csv): "
+                            f"{os.path.basename(csv_file)}")
+            continue
+        
+        week_str, year_str = match.groups()
+        week_index.append((int(year_str), int(week_str), csv_file))
+    
+    week_index.sort()
+    return week_index
+
+def load_manifest():
+    """Load the ingest manifest ({filename: entry}), empty if there is none"""
+    if not os.path.exists(MANIFEST_FILE):
+        return {}
+    
+    try:
+        with open(MANIFEST_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f).get('files', {})
+    except Exception as e:
+        logging.warning(f"Could not read manifest, doing full rebuild: {e}")
+        return {}
+
+def save_manifest(entries):
+    """Write the ingest manifest (via temp file, so it is never half-written)"""
+    manifest = {
+        'updated': datetime.now().isoformat(timespec='seconds'),
+        'files': entries
+    }
+    tmp_file = MANIFEST_FILE + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_file, MANIFEST_FILE)
+
+@phase_metrics.timed('consolidation_scan')
+def detect_changes(csv_files, manifest):
+    """
+    Compare weekly files with the manifest
+    Returns (changed files, unchanged manifest entries, removed filenames)
+    Files with the same size and mtime are not hashed again
+    """
+    changed = []
+    unchanged = {}
+    
+    for csv_file in csv_files:
+        filename = os.path.basename(csv_file)
+        stat = os.stat(csv_file)
+        entry = manifest.get(filename)
+        
+        if entry and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime:
+            unchanged[filename] = entry
+            continue
+        
+        # Size or mtime differs: the content hash decides
+        sha256 = master_store.file_hash(csv_file)
+        new_entry = {
+            'path': csv_file,
+            'size': stat.st_size,
+            'mtime': stat.st_mtime,
+            'sha256': sha256
+        }
+        
+        if entry and entry['sha256'] == sha256:
+            logging.info(f"Unchanged content (only touched): {filename}")
+            unchanged[filename] = new_entry
+        else:
+            changed.append((csv_file, new_entry))
+    
+    current = {os.path.basename(f) for f in csv_files}
+    removed = [filename for filename in manifest if filename not in current]
+    
+    return changed, unchanged, removed
+
+def update_schema(csv_files):
+    """
+    Infer the kind of columns that are not in the cached schema yet
+    Only files with unknown columns are sampled; returns the schema
+    """
+    schema = typed_ingest.load_schema(SCHEMA_FILE)
+    new_columns = []
+    
+    for csv_file in csv_files:
+        try:
+            columns = pd.read_csv(csv_file, nrows=0).columns
+            if all(column in schema for column in columns):
+                continue
+            
+            logging.info(f"Inferring column types from: {os.path.basename(csv_file)}")
+            sample = pd.read_csv(csv_file, dtype=str, nrows=SCHEMA_SAMPLE_ROWS)
+            new_columns += typed_ingest.infer_schema(sample, schema, THOUSANDS_SEPARATOR, DECIMAL_SEPARATOR)
+        except Exception as e:
+            logging.debug(f"Could not sample {csv_file}: {e}")  # Reported when the file is parsed
+            continue
+    
+    if new_columns:
+        typed_ingest.save_schema(SCHEMA_FILE, schema)
+        logging.info(f"Column schema updated with {len(new_columns)} columns: {SCHEMA_FILE}")
+    
+    return schema
+
+def parse_weekly_file(csv_file, schema=None):
+    """
+    Read one weekly CSV file and add Year/Week columns
+    Returns (year, week, DataFrame), or None if the file could not be processed
+    """
+    try:
+        # Extract week number and year from filename
+        # Format: data_week45_2025.csv
+        filename = os.path.basename(csv_file)
+        year, week_number = get_week_from_filename(csv_file)
+        
+        logging.info(f"Processing: {filename} (Week {week_number}, {year})")
+        
+        # Read CSV file (typed: read as text, then convert whole columns per the schema)
+        if schema is None:
+            df = pd.read_csv(csv_file)
+        else:
+            df = pd.read_csv(csv_file, dtype=str)
+            typed_ingest.apply_schema(df, schema, THOUSANDS_SEPARATOR, DECIMAL_SEPARATOR)
+        
+        # Add week number and year columns (at the beginning)
+        df.insert(0, 'Year', year)
+        df.insert(1, 'Week', week_number)
+        
+        return year, week_number, df
+    
+    except Exception as e:
+        logging.error(f"Error processing {csv_file}: {e}")
+        return None
+
+def stream_weekly_file(csv_file, chunk_size, store_folder, schema=None):
+    """
+    Stream one weekly CSV file into its week partition in store_folder, chunk by chunk
+    (the folder is passed in: pool workers do not see set_data_folder())
+    Returns (year, week, None) - the data is already in the store - or None on error
+    """
+    try:
+        filename = os.path.basename(csv_file)
+        year, week_number = get_week_from_filename(csv_file)
+        
+        logging.info(f"Streaming: {filename} (Week {week_number}, {year}, {chunk_size} rows per chunk)")
+
+        def tagged_chunks():
+            # Read as text: type inference per chunk could give different types per chunk
+            # With a schema, every chunk gets the same typed columns
+            with pd.read_csv(csv_file, chunksize=chunk_size, dtype=str) as reader:
+                for chunk in reader:
+                    if schema is not None:
+                        typed_ingest.apply_schema(chunk, schema, THOUSANDS_SEPARATOR, DECIMAL_SEPARATOR)
+                    chunk.insert(0, 'Year', year)
+                    chunk.insert(1, 'Week', week_number)
+                    yield chunk
+        
+        rows = master_store.write_week_partition_chunks(store_folder, year, week_number, tagged_chunks())
+        logging.info(f"  {rows} rows written to Year={year}/Week={week_number}")
+        
+        return year, week_number, None
+    
+    except Exception as e:
+        logging.error(f"Error processing {csv_file}: {e}")
+        return None
 
-def consolidate_weekly_data():
-    """Combine all weekly CSV files into one Excel file"""
+@phase_metrics.timed('consolidation_parse')
+def parse_weekly_files(csv_files, workers=1, chunk_size=None, schema=None):
+    """
+    Parse weekly CSV files, results in the same order as csv_files
+    With workers > 1 the files are parsed in a process pool (one file per task)
+    With a chunk_size the files are streamed into the store instead of returned
+    """
+    if chunk_size:
+        task = partial(stream_weekly_file, chunk_size=chunk_size, store_folder=MASTER_STORE, schema=schema)
+    else:
+        task = partial(parse_weekly_file, schema=schema)
+    
+    workers = max(1, min(workers, len(csv_files)))
+    
+    if workers == 1:
+        for csv_file in csv_files:
+            yield task(csv_file)
+        return
+    
+    logging.info(f"Parsing {len(csv_files)} files with {workers} worker processes")
+    # Spawned workers start from the module defaults: hand them this run's log file
+    with ProcessPoolExecutor(max_workers=workers, initializer=setup_logging, initargs=(LOG_FILE,)) as executor:
+        # At most 2 files per worker in flight, results in input order: parsed weeks
+        # wait in memory only until they are written, not the whole history
+        remaining = iter(csv_files)
+        pending = deque(executor.submit(task, csv_file) for csv_file in islice(remaining, 2 * workers))
+        while pending:
+            result = pending.popleft().result()
+            next_file = next(remaining, None)
+            if next_file is not None:
+                pending.append(executor.submit(task, next_file))
+            yield result
+
+def export_master_excel():
+    """Excel export of the store; skipped with a warning if it does not fit in one sheet"""
+    total_rows = master_store.store_row_count(MASTER_STORE)
+    if total_rows >= master_store.EXCEL_MAX_ROWS:
+        logging.warning(f"Excel export skipped: {total_rows} rows do not fit in one sheet "
+                        f"(max {master_store.EXCEL_MAX_ROWS - 1}) - {MASTER_FILE} is not updated, "
+                        f"use the master store instead")
+        return False
+    
+    logging.info(f"Exporting Excel from store: {MASTER_FILE}")
+    master_store.export_excel(MASTER_STORE, MASTER_FILE)
+    return True
+
+@phase_metrics.timed('consolidation_rollups')
+def refresh_rollups(weeks=None, schema=None):
+    """Update the rollups for the given weeks (None = rebuild); a failure is not critical"""
+    try:
+        rollups.update_rollups(MASTER_STORE, ROLLUP_FOLDER, weeks, dimensions=ROLLUP_DIMENSIONS, schema=schema)
+    except Exception as e:
+        logging.warning(f"Could not update rollups (not critical, rebuilt on the next run): {e}")
+        
+        # Without weekly totals the next run rebuilds all rollups
+        totals_file = os.path.join(ROLLUP_FOLDER, "weekly_totals.parquet")
+        if os.path.exists(totals_file):
+            os.remove(totals_file)
+
+@phase_metrics.timed_run('consolidation', lambda: WEEKLY_DATA_FOLDER)
+def consolidate_weekly_data(full_rebuild=False, export_excel=EXPORT_EXCEL, workers=MAX_WORKERS,
+                            chunk_size=CHUNK_SIZE, typed=TYPED_INGEST):
+    """Combine all weekly CSV files into the master store (only parses new/changed weeks)"""
     
     try:
         logging.info("=== Start Consolidation of Weekly Data ===")
         
-        # Find all data_weekXX_YYYY.csv files
-        pattern = os.path.join(WEEKLY_DATA_FOLDER, "data_week*.csv")
-        csv_files = glob.glob(pattern)
+        # Find all data_weekXX_YYYY.csv files, in chronological order
+        week_index = build_week_index(WEEKLY_DATA_FOLDER)
+        csv_files = [csv_file for _, _, csv_file in week_index]
         
         if not csv_files:
             logging.warning("No weekly CSV files found!")
@@ -43,66 +363,99 @@ def consolidate_weekly_data():
         
         logging.info(f"Found {len(csv_files)} weekly CSV files")
         
-        # List to store all dataframes
-        all_data = []
+        # Without an existing store the manifest is meaningless
+        manifest = {}
+        if not full_rebuild and os.path.isdir(MASTER_STORE):
+            manifest = load_manifest()
+        
+        if not manifest:
+            logging.info("Full rebuild: all weekly files will be processed")
         
-        # Read each CSV file and add week number
-        for csv_file in sorted(csv_files):
+        changed, manifest_entries, removed = detect_changes(csv_files, manifest)
+        logging.info(f"New/changed files: {len(changed)}, unchanged: {len(manifest_entries)}, removed: {len(removed)}")
+        
+        if not changed and not removed:
+            save_manifest(manifest_entries)
+            logging.info("Master store is already up to date, nothing to do")
+            if ROLLUPS and not os.path.exists(os.path.join(ROLLUP_FOLDER, "weekly_totals.parquet")):
+                refresh_rollups(schema=typed_ingest.load_schema(SCHEMA_FILE) if typed else None)
+            if export_excel and not os.path.exists(MASTER_FILE):
+                export_master_excel()
+            print(f"\n✓ Master store is up to date: {MASTER_STORE}")
+            return True
+        
+        processed_weeks = []
+        entries_by_file = dict(changed)
+        changed_files = [csv_file for csv_file in csv_files if csv_file in entries_by_file]
+        
+        # Column types are inferred once (cached) and shared by all workers
+        schema = update_schema(changed_files) if typed else None
+        
+        # Parse each new/changed CSV file (optionally in parallel), in week order
+        results = parse_weekly_files(changed_files, workers, chunk_size, schema)
+        for csv_file, result in zip(changed_files, results):
+            if result is None:
+                continue
+            
+            year, week_number, df = result
             try:
-                # Extract week number and year from filename
-                # Format: data_week45_2025.csv
-                filename = os.path.basename(csv_file)
-                parts = filename.replace('.csv', '').split('_')
-                
-                week_str = parts[1]  # "week45"
-                year_str = parts[2]  # "2025"
+                # Replace only this week in the store (streamed files are already written)
+                if df is not None:
+                    master_store.write_week_partition(MASTER_STORE, year, week_number, df)
                 
-                week_number = int(week_str.replace('week', ''))
-                year = int(year_str)
-                
-                logging.info(f"Processing: {filename} (Week {week_number}, {year})")
-                
-                # Read CSV file
-                df = pd.read_csv(csv_file)
-                
-                # Add week number and year columns (at the beginning)
-                df.insert(0, 'Year', year)
-                df.insert(1, 'Week', week_number)
-                
-                all_data.append(df)
+                # Commit the week: partition and manifest entry belong together, so an
+                # interrupted run resumes after the last completed week
+                processed_weeks.append((year, week_number))
+                manifest_entries[os.path.basename(csv_file)] = entries_by_file[csv_file]
+                save_manifest(manifest_entries)
                 
             except Exception as e:
                 logging.error(f"Error processing {csv_file}: {e}")
                 continue
         
-        if not all_data:
+        if not processed_weeks and not manifest:
             logging.error("No data successfully processed")
             return False
         
-        # Combine all dataframes
-        logging.info("Combining all data...")
-        master_df = pd.concat(all_data, ignore_index=True)
+        # Drop weeks whose weekly CSV no longer exists
+        current_weeks = {(year, week_number) for year, week_number, _ in week_index}
+        removed_weeks = []
+        for year, week_number in master_store.list_partitions(MASTER_STORE):
+            if (year, week_number) not in current_weeks:
+                master_store.delete_week_partition(MASTER_STORE, year, week_number)
+                removed_weeks.append((year, week_number))
+        
+        # Only record files as ingested once their partitions are written
+        save_manifest(manifest_entries)
         
-        # Sort by Year and Week (newest at the bottom)
-        master_df = master_df.sort_values(['Year', 'Week'])
+        # Rollups: only the periods of changed/removed weeks (everything on a full rebuild)
+        if ROLLUPS:
+            refresh_rollups(None if not manifest else processed_weeks + removed_weeks, schema)
         
-        logging.info(f"Total number of rows in master file: {len(master_df)}")
-        logging.info(f"Columns: {', '.join(master_df.columns.tolist())}")
+        partitions = master_store.list_partitions(MASTER_STORE)
+        total_rows = master_store.store_row_count(MASTER_STORE)
+        logging.info(f"Total number of rows in master store: {total_rows} ({len(partitions)} weeks)")
         
-        # Save as Excel file
-        logging.info(f"Saving to: {MASTER_FILE}")
-        master_df.to_excel(MASTER_FILE, index=False, engine='openpyxl')
+        # Optional: Excel export produced from the store
+        excel_exported = False
+        if export_excel:
+            with phase_metrics.span('consolidation_excel'):
+                excel_exported = export_master_excel()
+            logging.info(f"Columns: {', '.join(master_store.store_columns(MASTER_STORE))}")
         
-        # Also create a backup with timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_file = os.path.join(WEEKLY_DATA_FOLDER, f"master_data_backup_{timestamp}.xlsx")
-        master_df.to_excel(backup_file, index=False, engine='openpyxl')
-        logging.info(f"Backup saved: {backup_file}")
+        # Snapshot instead of a second full export: unchanged weeks are shared with older snapshots
+        with phase_metrics.span('consolidation_snapshot'):
+            snapshot_id = snapshots.create_snapshot(MASTER_STORE, SNAPSHOT_FOLDER, manifest_entries)
+            snapshots.prune_snapshots(SNAPSHOT_FOLDER, SNAPSHOT_RETENTION)
+        logging.info(f"Snapshot saved: {snapshot_id}")
         
         logging.info("=== Consolidation Successfully Completed ===")
-        print(f"\n✓ Master file created: {MASTER_FILE}")
-        print(f"  Total {len(master_df)} rows")
-        print(f"  Weeks: {master_df['Week'].min()} - {master_df['Week'].max()}")
+        print(f"\n✓ Master store updated: {MASTER_STORE}")
+        if excel_exported:
+            print(f"  Excel export: {MASTER_FILE}")
+        print(f"  Total {total_rows} rows")
+        if partitions:
+            print(f"  Weeks: {partitions[0][1]}/{partitions[0][0]} - {partitions[-1][1]}/{partitions[-1][0]}")
         
         return True
         
@@ -111,8 +464,82 @@ def consolidate_weekly_data():
         print(f"\n✗ Consolidation failed: {e}")
         return False
 
+def load_weeks(start=None, end=None, columns=None):
+    """
+    Load consolidated data for a range of weeks from the master store
+    Only the partitions in the range and the requested columns are read, e.g.
+        load_weeks(start=(2025, 40), end=(2025, 52), columns=['Campaign', 'Clicks'])
+    """
+    return master_store.read_store(MASTER_STORE, start=start, end=end, columns=columns)
+
+def load_rollup(period='month'):
+    """Load the monthly ('month'), quarterly ('quarter') or weekly ('week') rollup table"""
+    return rollups.load_rollup(ROLLUP_FOLDER, period)
+
+def restore_snapshot(snapshot_id, export_excel=EXPORT_EXCEL):
+    """Restore the master store (and ingest manifest) from a snapshot"""
+    try:
+        ingest_manifest = snapshots.restore_snapshot(MASTER_STORE, SNAPSHOT_FOLDER, snapshot_id)
+        
+        # Weekly files that differ from the snapshot are picked up again by the next run
+        save_manifest(ingest_manifest)
+        
+        if ROLLUPS:
+            refresh_rollups(schema=typed_ingest.load_schema(SCHEMA_FILE) if TYPED_INGEST else None)
+        
+        if export_excel:
+            export_master_excel()
+        
+        print(f"\n✓ Snapshot {snapshot_id} restored to: {MASTER_STORE}")
+        return True
+    
+    except Exception as e:
+        logging.error(f"ERROR during restore: {str(e)}", exc_info=True)
+        print(f"\n✗ Restore failed: {e}")
+        return False
+
+def print_snapshots():
+    """Print all available snapshots"""
+    snapshot_ids = snapshots.list_snapshots(SNAPSHOT_FOLDER)
+    if not snapshot_ids:
+        print("No snapshots found")
+        return
+    
+    for snapshot_id in snapshot_ids:
+        snapshot = snapshots.load_snapshot(SNAPSHOT_FOLDER, snapshot_id)
+        print(f"{snapshot_id}  ({len(snapshot['partitions'])} weeks, created {snapshot['created']})")
+
 if __name__ == "__main__":
-    success = consolidate_weekly_data()
+    parser = argparse.ArgumentParser(description="Combine weekly CSV files into the master store")
+    parser.add_argument('--full', action='store_true',
+                        help="Ignore the ingest manifest and re-read every weekly file")
+    parser.add_argument('--excel', dest='export_excel', action='store_true', default=EXPORT_EXCEL,
+                        help="Also export the master store to MASTER_FILE (Excel)")
+    parser.add_argument('--no-excel', dest='export_excel', action='store_false',
+                        help="Skip the Excel export")
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS,
+                        help="Number of worker processes for parsing CSV files")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE,
+                        help="Streaming mode: read CSV files in chunks of this many rows")
+    parser.add_argument('--no-types', dest='typed', action='store_false', default=TYPED_INGEST,
+                        help="Keep formatted values as text (no typed ingest)")
+    parser.add_argument('--list-snapshots', action='store_true',
+                        help="List the available snapshots of the master store")
+    parser.add_argument('--restore', metavar='SNAPSHOT_ID',
+                        help="Restore the master store from a snapshot")
+    args = parser.parse_args()
+    
+    setup_logging()
+    
+    if args.list_snapshots:
+        print_snapshots()
+        exit(0)
+    
+    if args.restore:
+        success = restore_snapshot(args.restore, export_excel=args.export_excel)
+    else:
+        success = consolidate_weekly_data(full_rebuild=args.full, export_excel=args.export_excel,
+                                          workers=args.workers, chunk_size=args.chunk_size, typed=args.typed)
     
     if success:
         exit(0)
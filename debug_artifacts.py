@@ -0,0 +1,111 @@
+"""
+Debug screenshots kept in memory, written to disk only when they are needed
+Each capture goes into a bounded ring (the last RING_SIZE screenshots); a
+background thread decodes the PNGs, so the download only pays for the capture
+itself. The ring is written to the output folder when a run fails:
+
+    debug_artifacts.capture(driver, "after_hover", OUTPUT_FOLDER)
+    ...
+    debug_artifacts.flush("download failed")   # writes after_hover.png, ...
+
+In verbose mode every capture is written right away (by the background thread);
+call drain() before the process ends so the last captures are not lost
+"""
+
+import os
+import queue
+import base64
+import logging
+import threading
+from collections import deque
+
+# Captures kept in memory (0 = no screenshots unless verbose)
+RING_SIZE = 12
+
+# Write every capture to disk, not only after a failure
+VERBOSE = False
+
+_ring = deque(maxlen=RING_SIZE)
+_ring_lock = threading.Lock()
+_pending = queue.Queue()
+_encoder = None
+
+def configure(ring_size=None, verbose=None):
+    """Change the ring size and/or verbose mode (drops the captures kept so far)"""
+    global RING_SIZE, VERBOSE, _ring
+    if ring_size is not None:
+        RING_SIZE = ring_size
+    if verbose is not None:
+        VERBOSE = verbose
+    with _ring_lock:
+        _ring = deque(maxlen=RING_SIZE)
+
+def write_capture(name, folder, png):
+    """Write one capture as <folder>/<name>.png, returns the path"""
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, f"{name}.png")
+    with open(path, 'wb') as f:
+        f.write(png)
+    return path
+
+def encode_captures():
+    """Background thread: decode queued captures into the ring (and write them in verbose mode)"""
+    while True:
+        name, folder, data = _pending.get()
+        try:
+            png = base64.b64decode(data)
+            with _ring_lock:
+                _ring.append((name, folder, png))
+            if VERBOSE:
+                logging.info(f"Screenshot: {write_capture(name, folder, png)}")
+        except Exception as e:
+            logging.warning(f"Could not keep screenshot '{name}': {e}")
+        finally:
+            _pending.task_done()
+
+def capture(driver, name, folder):
+    """Take a screenshot into the ring (written to `folder` on flush, or now if verbose)"""
+    global _encoder
+    if not RING_SIZE and not VERBOSE:
+        return
+    
+    try:
+        data = driver.get_screenshot_as_base64()
+    except Exception as e:
+        logging.debug(f"Could not take screenshot '{name}': {e}")
+        return
+    
+    if _encoder is None:
+        _encoder = threading.Thread(target=encode_captures, name="screenshot-encoder", daemon=True)
+        _encoder.start()
+    _pending.put((name, folder, data))
+
+def drain():
+    """Wait until all captures taken so far are in the ring (and written, in verbose mode)"""
+    _pending.join()
+
+def clear():
+    """Drop the captures kept so far (e.g. after a successful week, or when the next report starts)"""
+    drain()
+    with _ring_lock:
+        _ring.clear()
+
+def flush(reason):
+    """Write the screenshots in the ring (e.g. after a failure) and empty it; returns the paths"""
+    drain()
+    with _ring_lock:
+        captures = list(_ring)
+        _ring.clear()
+    
+    # Verbose mode wrote them already
+    if VERBOSE or not captures:
+        return []
+    
+    paths = []
+    for name, folder, png in captures:
+        try:
+            paths.append(write_capture(name, folder, png))
+        except OSError as e:
+            logging.warning(f"Could not write screenshot '{name}': {e}")
+    logging.info(f"Debug screenshots ({reason}): {', '.join(paths)}")
+    return paths
@@ -0,0 +1,47 @@
+"""
+Batch DOM inspection: describe many elements in one script round-trip
+Instead of get_attribute()/is_displayed() per element (one WebDriver HTTP
+call each), one in-page script returns a compact description of every
+element matching an XPath:
+
+    {'element': WebElement, 'tag': 'button', 'classes': '...', 'aria': 'More options',
+     'text': '...', 'visible': True, 'rect': {'x': 1510, 'y': 212, 'width': 24, 'height': 24}}
+"""
+
+DESCRIBE_SCRIPT = """
+var xpath = arguments[0], context = arguments[1] || document, limit = arguments[2];
+var found = document.evaluate(xpath, context, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+var count = limit ? Math.min(limit, found.snapshotLength) : found.snapshotLength;
+var result = [];
+for (var i = 0; i < count; i++) {
+    var el = found.snapshotItem(i);
+    var style = window.getComputedStyle(el);
+    var rect = el.getBoundingClientRect();
+    result.push({
+        element: el,
+        tag: el.tagName.toLowerCase(),
+        classes: el.getAttribute('class') || '',
+        aria: el.getAttribute('aria-label') || '',
+        text: (el.innerText || el.textContent || '').trim().slice(0, 80),
+        visible: el.getClientRects().length > 0 && style.visibility !== 'hidden'
+                 && style.display !== 'none' && style.opacity !== '0',
+        rect: {x: Math.round(rect.left), y: Math.round(rect.top),
+               width: Math.round(rect.width), height: Math.round(rect.height)}
+    });
+}
+return {total: found.snapshotLength, elements: result};
+"""
+
+def describe_elements(driver, xpath, within=None, limit=None):
+    """
+    Describe the elements matching xpath (relative to `within` if given) in one call
+    Returns (total number of matches, descriptions of the first `limit` matches)
+    """
+    result = driver.execute_script(DESCRIBE_SCRIPT, xpath, within, limit)
+    return result['total'], result['elements']
+
+def format_element(info, width=50):
+    """One log line for an element description"""
+    return (f"<{info['tag']}> visible={info['visible']}, aria='{info['aria'][:width]}', "
+            f"class='{info['classes'][:width]}', rect={info['rect']['x']},{info['rect']['y']} "
+            f"{info['rect']['width']}x{info['rect']['height']}")
@@ -4,8 +4,16 @@ Downloads data every Monday for the last 7 days
 """
 
 import os
+import re
 import time
 import glob
+import shutil
+import signal
+import filecmp
+import argparse
+import subprocess
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
 import logging
@@ -17,9 +25,18 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.action_chains import ActionChains
-import requests
-import zipfile
-import io
+from selenium.webdriver.common.keys import Keys
+from selenium.common.exceptions import ElementNotInteractableException
+
+import selector_cache
+import debug_artifacts
+import chromedriver_cache
+import phase_metrics
+import week_naming
+from dom_inspect import describe_elements, format_element
+from page_waits import (wait_until, dashboard_or_login, logged_in, document_ready, visible, any_visible,
+                        gone, in_viewport, wait_for_table_render, TABLE_XPATH, HEADER_XPATH, HEADER_BUTTON_XPATH,
+                        CALENDAR_XPATH, MENU_XPATH, DIALOG_XPATH, MORE_OPTIONS_MARKERS, MENU_BUTTON_INSET)
 
 # ============================================
 # CONFIGURATION
@@ -32,6 +49,65 @@ LOG_FILE = os.path.join(OUTPUT_FOLDER, "download_log.txt")
 # File pattern for downloaded files
 DOWNLOAD_FILE_PATTERN = "*Table*.csv"  # Adjust to match your Looker export filename
 
+# Wait deadlines (seconds) - each step continues as soon as the page is ready
+PAGE_TIMEOUT = 30           # Dashboard load, table (re)render
+LOGIN_TIMEOUT = 120         # Manual login in the Chrome window
+MENU_TIMEOUT = 3            # Menu/dialog to appear after a click
+TABLE_QUIET_SECONDS = 1.0   # Table counts as rendered after this long without DOM changes
+TABLE_RELOAD_GRACE = 3      # After Apply: time for the reload to start before the table counts as unchanged
+
+# How the date picker's start/end inputs show dates (the first is used for typing)
+DATE_INPUT_FORMATS = ["%b %d, %Y", "%m/%d/%Y", "%d/%m/%Y", "%Y-%m-%d"]
+
+# Remembers (per report, in its output folder) which selector/menu button worked,
+# so the next run tries it first
+SELECTOR_CACHE_FILE = "selector_cache.json"
+
+# Backfill (--start/--end): retries per week before it is reported as failed
+BACKFILL_RETRIES = 2
+
+# Folder to consolidate after a download (None = WEEKLY_DATA_FOLDER of consolidate_weekly_data.py)
+CONSOLIDATE_FOLDER = None
+
+# Chromedriver: one driver per Chrome build in CHROMEDRIVER_DIR (downloaded once per Chrome update)
+# Mirror for offline hosts: a local folder or URL laid out like Chrome for Testing
+# (<version>/<platform>/chromedriver-<platform>.zip), None = download from Google
+CHROMEDRIVER_DIR = os.path.join(os.path.expanduser("~"), ".chromedriver")
+CHROMEDRIVER_MIRROR = None
+
+# Chrome profile with the Looker login (see copy_chrome_cookies.py)
+CHROME_PROFILE_DIR = os.path.join(os.path.expanduser("~"), "chrome_automation_data")
+
+# Several reports (--reports): each is saved to OUTPUT_FOLDER/<name>/data_weekXX_YYYY.csv
+# e.g. {'name': 'sea', 'url': "https://lookerstudio.google.com/reporting/.../page/..."}
+# optional: 'file_pattern' if the export is not named like DOWNLOAD_FILE_PATTERN
+REPORTS = []
+
+# Number of reports exported at the same time (one Chrome per worker)
+MAX_BROWSERS = 2
+
+# Each worker gets its own profile clone and download folder here
+WORKER_FOLDER = os.path.join(os.path.expanduser("~"), "chrome_automation_workers")
+
+# Lean mode (--lean): headless Chrome at a fixed window size that does not load
+# images, fonts or analytics - faster and lighter, but needs a profile that is
+# already logged in (no manual login possible)
+LEAN_MODE = False
+LEAN_WINDOW_SIZE = "1920,1080"
+
+# URL patterns blocked in lean mode (the data table does not need them)
+LEAN_BLOCKED_URLS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*google-analytics.com*", "*googletagmanager.com*", "*analytics.google.com*",
+    "*doubleclick.net*", "*googleadservices.com*", "*play.google.com/log*",
+]
+
+# Debug screenshots: the last DEBUG_SCREENSHOTS are kept in memory and written to
+# OUTPUT_FOLDER only when a download fails (VERBOSE_SCREENSHOTS / --verbose: always)
+DEBUG_SCREENSHOTS = 12
+VERBOSE_SCREENSHOTS = False
+
 # ============================================
 
 # Setup logging with UTF-8 encoding to handle special characters
@@ -44,8 +120,13 @@ logging.basicConfig(
     ]
 )
 
-def get_week_number():
-    """Calculate week number and year for the previous week (Sunday to Saturday)"""
+debug_artifacts.configure(DEBUG_SCREENSHOTS, VERBOSE_SCREENSHOTS)
+
+# Reports without a 'file_pattern' use the configured one (see set_report)
+DEFAULT_FILE_PATTERN = DOWNLOAD_FILE_PATTERN
+
+def get_last_week_sunday():
+    """Sunday of the previous week (Sunday to Saturday)"""
     today = datetime.now()
     
     # How many days ago was the most recent Sunday?
@@ -54,100 +135,32 @@ def get_week_number():
         days_since_sunday = 7
     
     # Sunday of previous week
-    last_sunday = today - timedelta(days=days_since_sunday + 7)
-    
-    # Use ISO week number of the Sunday
-    week_number = last_sunday.isocalendar()[1]
-    year = last_sunday.year
+    return (today - timedelta(days=days_since_sunday + 7)).date()
     
-    return week_number, year
+def get_week_of(sunday):
+    """Week number and year used in the file name of the week starting on `sunday`"""
+    return week_naming.week_of(sunday)
 
-def get_chrome_version():
-    """Get Chrome version from registry (Windows only)"""
-    try:
-        import winreg
-        key = winreg.OpenKey(winreg.HKEY_CURRENT_USER, r"Software\Google\Chrome\BLBeacon")
-        version, _ = winreg.QueryValueEx(key, "version")
-        winreg.CloseKey(key)
-        return version
-    except:
-        return None
+def get_week_number():
+    """Calculate week number and year for the previous week (Sunday to Saturday)"""
+    return get_week_of(get_last_week_sunday())
 
 def download_chromedriver():
-    """Download correct chromedriver version for win64"""
-    driver_dir = os.path.join(os.path.expanduser("~"), ".chromedriver")
-    os.makedirs(driver_dir, exist_ok=True)
-    
-    driver_path = os.path.join(driver_dir, "chromedriver.exe")
-    
-    # If driver already exists and is recent (< 7 days), use it
-    if os.path.exists(driver_path):
-        file_age = time.time() - os.path.getmtime(driver_path)
-        if file_age < 7 * 24 * 3600:  # 7 days
-            logging.info(f"Using existing chromedriver: {driver_path}")
-            return driver_path
-    
-    # Get Chrome version
-    chrome_version = get_chrome_version()
-    if not chrome_version:
-        logging.error("Cannot determine Chrome version")
-        return None
-    
-    # Get major version (e.g., 142 from 142.0.7444.162)
-    major_version = chrome_version.split('.')[0]
-    
-    logging.info(f"Chrome version: {chrome_version}")
-    
-    # Download correct chromedriver for win64
-    try:
-        # Get latest version for this Chrome version
-        api_url = f"https://googlechromelabs.github.io/chrome-for-testing/latest-versions-per-milestone-with-downloads.json"
-        response = requests.get(api_url)
-        data = response.json()
-        
-        if major_version not in data['milestones']:
-            logging.error(f"No chromedriver for Chrome {major_version}")
-            return None
-        
-        # Find win64 download URL
-        downloads = data['milestones'][major_version]['downloads']['chromedriver']
-        win64_url = None
-        for download in downloads:
-            if download['platform'] == 'win64':
-                win64_url = download['url']
-                break
-        
-        if not win64_url:
-            logging.error("No win64 chromedriver found")
-            return None
-        
-        logging.info(f"Downloading chromedriver from: {win64_url}")
-        
-        # Download and unzip
-        response = requests.get(win64_url)
-        with zipfile.ZipFile(io.BytesIO(response.content)) as zip_file:
-            # Find chromedriver.exe in the zip
-            for file_name in zip_file.namelist():
-                if file_name.endswith('chromedriver.exe'):
-                    # Extract to driver_dir
-                    with zip_file.open(file_name) as source:
-                        with open(driver_path, 'wb') as target:
-                            target.write(source.read())
-                    break
-        
-        logging.info(f"Chromedriver installed: {driver_path}")
-        return driver_path
-        
-    except Exception as e:
-        logging.error(f"Error downloading chromedriver: {e}")
-        return None
+    """Chromedriver for the installed Chrome (cached per Chrome build, see chromedriver_cache.py)"""
+    return chromedriver_cache.get_chromedriver(CHROMEDRIVER_DIR, CHROMEDRIVER_MIRROR)
 
-def setup_chrome_driver():
-    """Setup Chrome driver with automation profile"""
+@phase_metrics.timed('driver_setup')
+def setup_chrome_driver(profile_dir=None, download_folder=None, lean=None):
+    """
+    Setup Chrome driver with automation profile (defaults: CHROME_PROFILE_DIR, DOWNLOAD_FOLDER)
+    lean: headless with resource blocking (default: LEAN_MODE)
+    """
+    lean = LEAN_MODE if lean is None else lean
+    download_folder = download_folder or DOWNLOAD_FOLDER
     chrome_options = Options()
     
     # Use a dedicated automation profile (not the default profile)
-    automation_dir = os.path.join(os.path.expanduser("~"), "chrome_automation_data")
+    automation_dir = profile_dir or CHROME_PROFILE_DIR
     chrome_options.add_argument(f"--user-data-dir={automation_dir}")
     
     # Extra options for stability
@@ -155,11 +168,26 @@ def setup_chrome_driver():
     chrome_options.add_argument("--disable-dev-shm-usage")
     chrome_options.add_argument("--disable-gpu")
     chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-    chrome_options.add_argument("--start-maximized")
+    if lean:
+        # Headless at a fixed size, without the Chrome features the export does not use
+        chrome_options.add_argument("--headless=new")
+        chrome_options.add_argument(f"--window-size={LEAN_WINDOW_SIZE}")
+        chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+        chrome_options.add_argument("--disable-extensions")
+        chrome_options.add_argument("--disable-background-networking")
+        chrome_options.add_argument("--disable-component-update")
+        chrome_options.add_argument("--disable-default-apps")
+        chrome_options.add_argument("--disable-sync")
+        chrome_options.add_argument("--no-first-run")
+        chrome_options.add_argument("--mute-audio")
+        chrome_options.add_argument("--disable-features=Translate,OptimizationHints,MediaRouter,"
+                                    "InterestFeedContentSuggestions,CalculateNativeWinOcclusion")
+    else:
+        chrome_options.add_argument("--start-maximized")
     
     # Download settings
     prefs = {
-        "download.default_directory": DOWNLOAD_FOLDER,
+        "download.default_directory": download_folder,
         "download.prompt_for_download": False,
         "download.directory_upgrade": True,
         "safebrowsing.enabled": True,
@@ -179,333 +207,718 @@ def setup_chrome_driver():
     service = Service(driver_path)
     driver = webdriver.Chrome(service=service, options=chrome_options)
     
+    if lean:
+        apply_lean_mode(driver, download_folder)
+    
     return driver
 
-def wait_for_download(filename_pattern, timeout=60):
-    """Wait until download is complete"""
+def apply_lean_mode(driver, download_folder):
+    """Block non-essential requests (DevTools network controls) and allow headless downloads"""
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": LEAN_BLOCKED_URLS})
+    
+    # Headless Chrome only downloads when told where to
+    driver.execute_cdp_cmd("Browser.setDownloadBehavior", {"behavior": "allow", "downloadPath": download_folder})
+    logging.info(f"Lean mode: headless, {len(LEAN_BLOCKED_URLS)} URL patterns blocked")
+
+@phase_metrics.timed('download_wait')
+def wait_for_download(filename_pattern, timeout=60, newer_than=None, download_folder=None):
+    """
+    Wait until download is complete
+    newer_than: only accept files written after this time (ignores older downloads)
+    """
+    download_folder = download_folder or DOWNLOAD_FOLDER
     logging.info(f"Waiting for download: {filename_pattern}")
     
-    end_time = time.time() + timeout
-    while time.time() < end_time:
+    def finished_download():
         # Search for files matching the pattern
-        files = glob.glob(os.path.join(DOWNLOAD_FOLDER, filename_pattern))
+        files = glob.glob(os.path.join(download_folder, filename_pattern))
+        if newer_than is not None:
+            files = [f for f in files if os.path.getmtime(f) >= newer_than - 1]
         
         if files:
             # Check if there's no .crdownload file (Chrome download in progress)
-            downloading = glob.glob(os.path.join(DOWNLOAD_FOLDER, "*.crdownload"))
+            downloading = glob.glob(os.path.join(download_folder, "*.crdownload"))
             if not downloading:
                 # Take the most recent file
-                latest_file = max(files, key=os.path.getctime)
-                logging.info(f"Download complete: {latest_file}")
-                return latest_file
+                return max(files, key=os.path.getctime)
+        return None
         
-        time.sleep(1)
+    latest_file = wait_until(finished_download, timeout, "download", poll=0.2, required=False)
+    if not latest_file:
+        raise TimeoutError(f"Download timeout after {timeout} seconds")
+    
+    logging.info(f"Download complete: {latest_file}")
+    return latest_file
+
+@phase_metrics.timed('rename')
+def save_week_file(downloaded_file, week_num, year):
+    """
+    Move a download to data_weekXX_YYYY.csv, replacing the week as one unit
+    Returns (path, changed) - an identical re-download keeps the existing file
+    """
+    new_filename = f"data_week{week_num:02d}_{year}.csv"
+    new_filepath = os.path.join(OUTPUT_FOLDER, new_filename)
+    
+    # Re-download with the same content: keep the existing file (and its mtime),
+    # so consolidation sees an unchanged week
+    if os.path.exists(new_filepath) and filecmp.cmp(downloaded_file, new_filepath, shallow=False):
+        logging.info(f"Downloaded data is identical to existing file, keeping: {new_filepath}")
+        os.remove(downloaded_file)
+        return new_filepath, False
     
-    raise TimeoutError(f"Download timeout after {timeout} seconds")
+    # Move next to the destination first (Downloads may be on another drive),
+    # then swap it in: the week file is never missing or half-written
+    tmp_filepath = new_filepath + ".part"
+    shutil.move(downloaded_file, tmp_filepath)
+    if os.path.exists(new_filepath):
+        logging.info(f"Existing file found, replacing: {new_filepath}")
+    os.replace(tmp_filepath, new_filepath)
+    logging.info(f"File saved as: {new_filepath}")
+    
+    return new_filepath, True
 
-def close_chrome_processes():
-    """Close all Chrome processes"""
-    import subprocess
+def driver_pids(driver):
+    """PIDs this script owns for a driver: chromedriver (its Chrome processes are children)"""
     try:
-        # Try to close Chrome processes
-        subprocess.run(['taskkill', '/F', '/IM', 'chrome.exe'], 
-                      capture_output=True, 
-                      timeout=5)
-        time.sleep(2)  # Wait a moment
-        logging.info("Chrome processes closed")
-    except:
-        pass  # No problem if Chrome is not running
+        return [driver.service.process.pid]
+    except AttributeError:
+        return []
 
-def download_looker_data():
-    """Main function to download Looker Studio data"""
-    driver = None
+def child_pids(pid):
+    """All descendants of a process (POSIX, via ps)"""
+    output = subprocess.run(['ps', '-A', '-o', 'pid=,ppid='], capture_output=True, text=True, timeout=5).stdout
+    children = {}
+    for line in output.splitlines():
+        child, parent = (int(part) for part in line.split())
+        children.setdefault(parent, []).append(child)
     
+    found = []
+    pending = [pid]
+    while pending:
+        for child in children.get(pending.pop(), []):
+            found.append(child)
+            pending.append(child)
+    return found
+
+def close_chrome_processes(pids):
+    """Close the Chrome processes started by this script (chromedriver PIDs and their children)"""
+    for pid in pids:
+        try:
+            if os.name == 'nt':
+                # /T: the whole tree below chromedriver, other Chrome windows are not touched
+                subprocess.run(['taskkill', '/F', '/T', '/PID', str(pid)], capture_output=True, timeout=5)
+            else:
+                for process in [pid] + child_pids(pid):
+                    try:
+                        os.kill(process, signal.SIGKILL)
+                    except ProcessLookupError:
+                        pass
+            logging.info(f"Chrome processes of PID {pid} closed")
+        except Exception as e:
+            logging.warning(f"Could not close Chrome processes of PID {pid}: {e}")
+
+def quit_driver(driver):
+    """Quit the browser; if that fails, kill the processes this driver started"""
+    pids = driver_pids(driver)
     try:
-        logging.info("=== Start Looker Studio Download ===")
-        
-        # Check if output folder exists
-        os.makedirs(OUTPUT_FOLDER, exist_ok=True)
-        
-        # Setup driver
-        logging.info("Starting Chrome browser...")
-        driver = setup_chrome_driver()
-        
-        # Go to Looker Studio dashboard
-        logging.info(f"Navigating to dashboard...")
+        driver.quit()
+    except Exception as e:
+        logging.warning(f"Browser did not quit cleanly ({e}), closing its processes")
+        close_chrome_processes(pids)
+
+def get_week_dates(week_num, year):
+    """
+    Sunday and Saturday of a week as named by get_week_number()
+    (ISO week number of the Sunday, calendar year of the Sunday)
+    """
+    sunday = week_naming.week_sunday(week_num, year)
+    return sunday, sunday + timedelta(days=6)
+
+def parse_week(value):
+    """'2025-45' (YYYY-WW) -> Sunday of that week"""
+    try:
+        year, week_num = (int(part) for part in value.split('-'))
+        sunday, _ = get_week_dates(week_num, year)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Week must look like YYYY-WW (e.g. 2025-45): {value}")
+    return sunday
+
+def weeks_in_range(first_sunday, last_sunday):
+    """Sundays of all weeks from first_sunday to last_sunday (inclusive), oldest first"""
+    sundays = []
+    sunday = first_sunday
+    while sunday <= last_sunday:
+        sundays.append(sunday)
+        sunday += timedelta(days=7)
+    return sundays
+
+def cache_file():
+    """Selector cache of the current report"""
+    return os.path.join(OUTPUT_FOLDER, SELECTOR_CACHE_FILE)
+
+def open_dashboard(driver):
+    """Navigate to the dashboard, wait for a manual login if needed and for the table to render"""
+    # Go to Looker Studio dashboard
+    logging.info(f"Navigating to dashboard...")
+    with phase_metrics.span('navigation'):
         driver.get(LOOKER_URL)
-        
-        # Check if we're logged in - if not, wait for manual login
-        time.sleep(5)
-        if "accounts.google.com" in driver.current_url or "signin" in driver.current_url.lower():
+    
+    # Check if we're logged in - if not, wait for manual login
+    with phase_metrics.span('login_check'):
+        page = wait_until(dashboard_or_login(driver), PAGE_TIMEOUT, "dashboard or login page", required=False)
+        if page == 'login':
+            if LEAN_MODE:
+                raise Exception("Not logged in - run once without --lean and log in in the Chrome window")
             logging.info("=" * 60)
             logging.info("NOT LOGGED IN - Please log in manually in the Chrome window")
-            logging.info("Waiting 60 seconds for login...")
+            logging.info(f"Waiting up to {LOGIN_TIMEOUT} seconds for login...")
             logging.info("=" * 60)
-            time.sleep(60)  # Give user time to log in
-        
-        # Wait until page is loaded
-        logging.info("Waiting for dashboard to load...")
-        time.sleep(10)  # Extra wait time for Looker Studio
-        
-        # Screenshot to see HTML structure
-        debug_path = os.path.join(OUTPUT_FOLDER, "debug_initial.png")
-        driver.save_screenshot(debug_path)
-        logging.info(f"Debug screenshot: {debug_path}")
-        
-        # Print all visible divs with 'table' or 'chart' in class
-        logging.info("Searching for table/chart elements...")
-        possible_tables = driver.find_elements(By.XPATH, "//*[contains(@class, 'table') or contains(@class, 'chart') or contains(@class, 'grid') or contains(@class, 'data')]")
-        logging.info(f"Found {len(possible_tables)} possible table/chart elements")
-        
-        for idx, elem in enumerate(possible_tables[:10]):  # Max 10
-            try:
-                if elem.is_displayed():
-                    class_name = elem.get_attribute('class')
-                    tag_name = elem.tag_name
-                    logging.info(f"  Element {idx}: <{tag_name}> class='{class_name[:100]}'")
-            except:
-                pass
-        
-        # Select dates: Sunday to Saturday of previous week
-        logging.info("Selecting dates (Sunday to Saturday of previous week)...")
-        
-        # Calculate the dates
-        today = datetime.now()
-        
-        # Debug logging
-        logging.info(f"Today: {today.strftime('%A %d %B %Y')}, weekday={today.weekday()}")
-        
-        # weekday(): 0=Monday, 1=Tuesday, 2=Wednesday, 3=Thursday, 4=Friday, 5=Saturday, 6=Sunday
-        # We want: Sunday of PREVIOUS week (not this week!)
-        
-        # Step 1: Calculate how many days ago the most recent Sunday was
-        # Monday = 1 day ago, Tuesday = 2 days, etc.
-        # Sunday itself = 0 days (but we want previous Sunday then)
-        days_since_sunday = (today.weekday() + 1) % 7
-        
-        if days_since_sunday == 0:
-            # Today is Sunday - the most recent Sunday is TODAY
-            # But we want Sunday of PREVIOUS week
-            days_to_last_week_sunday = 7
-        else:
-            # Otherwise: go back to most recent Sunday, then 7 more days back
-            days_to_last_week_sunday = days_since_sunday + 7
-        
-        logging.info(f"Days back to Sunday of previous week: {days_to_last_week_sunday}")
-        
-        # Sunday of previous week
-        last_sunday = today - timedelta(days=days_to_last_week_sunday)
-        logging.info(f"Sunday of previous week: {last_sunday.strftime('%A %d %B %Y')}")
-        
-        # Verify it's actually a Sunday
-        if last_sunday.weekday() != 6:
-            logging.error(f"ERROR: Calculated date is not a Sunday! weekday={last_sunday.weekday()}")
-        
-        # Saturday of previous week = Sunday + 6 days
-        last_saturday = last_sunday + timedelta(days=6)
-        logging.info(f"Saturday of previous week: {last_saturday.strftime('%A %d %B %Y')}")
-        
-        # Verify it's actually a Saturday
-        if last_saturday.weekday() != 5:
-            logging.error(f"ERROR: Calculated date is not a Saturday! weekday={last_saturday.weekday()}")
-        
-        # Extract day numbers for clicking in calendar
-        start_day = last_sunday.day
-        end_day = last_saturday.day
-        start_month = last_sunday.strftime("%B")  # Full month name
-        end_month = last_saturday.strftime("%B")
-        
-        # Format dates (Windows compatible - no %-d)
-        start_date_str = last_sunday.strftime("%b %d, %Y").replace(" 0", " ")  # "Nov 10, 2025"
-        end_date_str = last_saturday.strftime("%b %d, %Y").replace(" 0", " ")  # "Nov 16, 2025"
-        
-        logging.info(f"Period: {start_date_str} - {end_date_str}")
-        logging.info(f"Start day number: {start_day}, End day number: {end_day}")
-        
+            wait_until(logged_in(driver), LOGIN_TIMEOUT, "manual login", poll=1, required=False)
+    
+    # Wait until page is loaded
+    logging.info("Waiting for dashboard to load...")
+    with phase_metrics.span('navigation'):
+        wait_until(document_ready(driver), PAGE_TIMEOUT, "page load", required=False)
+        wait_for_table_render(driver, TABLE_QUIET_SECONDS, PAGE_TIMEOUT)
+    
+    # Screenshot to see HTML structure
+    debug_artifacts.capture(driver, "debug_initial", OUTPUT_FOLDER)
+    
+    # Print all visible divs with 'table' or 'chart' in class
+    logging.info("Searching for table/chart elements...")
+    total, possible_tables = describe_elements(driver, "//*[contains(@class, 'table') or contains(@class, 'chart') or contains(@class, 'grid') or contains(@class, 'data')]", limit=10)  # Max 10
+    logging.info(f"Found {total} possible table/chart elements")
+    
+    for idx, info in enumerate(possible_tables):
+        if info['visible']:
+            logging.info(f"  Element {idx}: <{info['tag']}> class='{info['classes'][:100]}'")
+
+def format_picker_date(day):
+    """Date as the date picker shows it: 'Nov 10, 2025' (Windows compatible - no %-d)"""
+    return day.strftime("%b %d, %Y").replace(" 0", " ")
+
+def typed_picker_date(day):
+    """Date as typed into the picker inputs: the first of DATE_INPUT_FORMATS ('Nov 9, 2025')"""
+    return day.strftime(DATE_INPUT_FORMATS[0]).replace(" 0", " ")
+
+def picker_date(value):
+    """Parse a date the picker shows in an input ('Nov 10, 2025', '11/10/2025', ...), None if unknown"""
+    for date_format in DATE_INPUT_FORMATS:
         try:
-            # Click on date range selector to open calendars
-            date_selector = WebDriverWait(driver, 20).until(
-                EC.element_to_be_clickable((By.XPATH, "//div[contains(@class, 'date') or contains(@aria-label, 'date') or contains(@class, 'date-range')]"))
-            )
-            date_selector.click()
-            time.sleep(3)  # Wait for calendars to appear
-            
-            # Screenshot AFTER clicking on date selector
-            date_menu_screenshot = os.path.join(OUTPUT_FOLDER, "date_menu_after_click.png")
-            driver.save_screenshot(date_menu_screenshot)
-            logging.info(f"Screenshot of date calendars: {date_menu_screenshot}")
+            return datetime.strptime(value.strip(), date_format).date()
+        except ValueError:
+            continue
+    return None
+
+# (start input, end input) pairs of the open date picker, tried in this order
+DATE_INPUT_SELECTORS = [
+    ("//input[contains(@class, 'mat-start-date')]", "//input[contains(@class, 'mat-end-date')]"),
+    ("//input[contains(@aria-label, 'Start date')]", "//input[contains(@aria-label, 'End date')]"),
+    ("(//*[contains(@class, 'date-range')]//input)[1]", "(//*[contains(@class, 'date-range')]//input)[2]"),
+]
+
+def picker_input_range(driver):
+    """(start, end) the open picker's inputs show, or None if they cannot be read"""
+    for start_selector, end_selector in DATE_INPUT_SELECTORS:
+        try:
+            start_input = driver.find_element(By.XPATH, start_selector)
+            end_input = driver.find_element(By.XPATH, end_selector)
+        except Exception:
+            continue
+        shown = (picker_date(start_input.get_attribute('value') or ''),
+                 picker_date(end_input.get_attribute('value') or ''))
+        if None not in shown:
+            return shown
+    return None
+
+def control_date_range(date_control):
+    """(start, end) the date control shows after Apply ('Nov 9, 2025 - Nov 15, 2025'), or None"""
+    try:
+        parts = re.split(r"\s+[-–]\s+", date_control.text.strip())
+    except Exception:
+        return None  # Control re-rendered with the new range
+    if len(parts) != 2:
+        return None
+    shown = (picker_date(parts[0]), picker_date(parts[1]))
+    return shown if None not in shown else None
+
+def type_date_range(driver, start_date, end_date):
+    """
+    Fast path: type start_date and end_date into the open picker's start/end inputs
+    Returns True if both inputs show the typed dates afterwards
+    """
+    for index, (start_selector, end_selector) in selector_cache.ordered(cache_file(), LOOKER_URL, 'date_inputs',
+                                                                        DATE_INPUT_SELECTORS):
+        try:
+            start_input = driver.find_element(By.XPATH, start_selector)
+            end_input = driver.find_element(By.XPATH, end_selector)
+            if not (start_input.is_displayed() and end_input.is_displayed()):
+                continue
             
-            # The calendars are now visible - no "Custom" option needed!
-            # Click directly on the day numbers in the calendars
+            # The picker only takes a typed value once the input loses focus
+            for date_input, day in ((start_input, start_date), (end_input, end_date)):
+                date_input.send_keys(Keys.CONTROL, 'a')
+                date_input.send_keys(Keys.DELETE)
+                date_input.send_keys(typed_picker_date(day), Keys.TAB)
             
-            # STEP 1: Click on start date (Sunday = day 10 in left calendar)
-            logging.info(f"Trying to click start date: day {start_day}")
-            start_clicked = False
+            typed = wait_until(lambda: (picker_date(start_input.get_attribute('value') or '') == start_date
+                                        and picker_date(end_input.get_attribute('value') or '') == end_date),
+                               MENU_TIMEOUT, "typed dates accepted", required=False)
+            if typed:
+                logging.info(f"✓ Dates typed into the picker inputs ({start_selector})")
+                selector_cache.record(cache_file(), LOOKER_URL, 'date_inputs', index)
+                return True
+            logging.debug(f"Picker did not accept the typed dates with '{start_selector}'")
+        except Exception as e:
+            logging.debug(f"Date inputs '{start_selector}' don't work: {e}")
+            continue
+    
+    selector_cache.record(cache_file(), LOOKER_URL, 'date_inputs', None)
+    return False
+
+def click_date_range(driver, start_date, end_date):
+    """
+    Fallback: click the start and end day in the open picker's two calendars
+    Returns True if both days were clicked
+    """
+    # Extract day numbers for clicking in calendar
+    start_day = start_date.day
+    end_day = end_date.day
+    start_month = start_date.strftime("%B")  # Full month name
+    end_month = end_date.strftime("%B")
+    logging.info(f"Start day number: {start_day}, End day number: {end_day}")
+    
+    # The calendars are now visible - no "Custom" option needed!
+    # Click directly on the day numbers in the calendars
+    
+    # STEP 1: Click on start date (Sunday = day 10 in left calendar)
+    logging.info(f"Trying to click start date: day {start_day}")
+    start_clicked = False
+    
+    # Try multiple ways to find the start day
+    start_selectors = [
+        # Method 1: Via aria-label with full date
+        f"//button[@aria-label='{start_month} {start_day}, {start_date.year}']",
+        f"//button[@aria-label='{start_month[:3]} {start_day}, {start_date.year}']",
+        # Method 2: Via day number in calendar cell
+        f"//div[contains(@class, 'mat-calendar-body-cell-content') and text()='{start_day}']",
+        f"//button[contains(@class, 'mat-calendar-body-cell') and .//div[text()='{start_day}']]",
+        # Method 3: Simple - just button with day number
+        f"//button[contains(@class, 'mat-calendar') and contains(., '{start_day}')]",
+    ]
+    
+    start_index = None
+    for index, selector in selector_cache.ordered(cache_file(), LOOKER_URL, 'start_day', start_selectors):
+        try:
+            start_day_button = driver.find_element(By.XPATH, selector)
+            if start_day_button.is_displayed():
+                start_day_button.click()
+                logging.info(f"✓ Start date clicked with selector: {selector}")
+                start_clicked = True
+                start_index = index
+                break
+        except Exception as e:
+            logging.debug(f"Start selector '{selector}' doesn't work: {e}")
+            continue
+    selector_cache.record(cache_file(), LOOKER_URL, 'start_day', start_index)
+    
+    if not start_clicked:
+        logging.error(f"Could not click start date (day {start_day}) with any selector")
+    
+    # STEP 2: Click on end date (Saturday = day 15 in RIGHT calendar)
+    logging.info(f"Trying to click end date: day {end_day} in RIGHT calendar")
+    end_clicked = False
+    
+    # First: find all calendars on the page
+    try:
+        all_calendars = driver.find_elements(By.XPATH, CALENDAR_XPATH)
+        logging.info(f"Found {len(all_calendars)} calendars")
+        
+        if len(all_calendars) >= 2:
+            # There are 2 calendars - use the SECOND (right) for end date
+            right_calendar = all_calendars[1]
+            logging.info("Searching in right calendar for end date...")
             
-            # Try multiple ways to find the start day
-            start_selectors = [
-                # Method 1: Via aria-label with full date
-                f"//button[@aria-label='{start_month} {start_day}, {last_sunday.year}']",
-                f"//button[@aria-label='{start_month[:3]} {start_day}, {last_sunday.year}']",
-                # Method 2: Via day number in calendar cell
-                f"//div[contains(@class, 'mat-calendar-body-cell-content') and text()='{start_day}']",
-                f"//button[contains(@class, 'mat-calendar-body-cell') and .//div[text()='{start_day}']]",
-                # Method 3: Simple - just button with day number
-                f"//button[contains(@class, 'mat-calendar') and contains(., '{start_day}')]",
+            # Search day-button WITHIN the right calendar
+            end_selectors_in_calendar = [
+                f".//button[@aria-label='{end_month} {end_day}, {end_date.year}']",
+                f".//button[@aria-label='{end_month[:3]} {end_day}, {end_date.year}']",
+                f".//div[contains(@class, 'mat-calendar-body-cell-content') and text()='{end_day}']",
+                f".//button[contains(@class, 'mat-calendar-body-cell') and .//div[text()='{end_day}']]",
+                f".//button[contains(., '{end_day}') and not(contains(@class, 'mat-calendar-body-disabled'))]",
             ]
             
-            for selector in start_selectors:
+            end_index = None
+            for index, selector in selector_cache.ordered(cache_file(), LOOKER_URL, 'end_day',
+                                                          end_selectors_in_calendar):
                 try:
-                    start_day_button = driver.find_element(By.XPATH, selector)
-                    if start_day_button.is_displayed():
-                        start_day_button.click()
-                        time.sleep(1)
-                        logging.info(f"✓ Start date clicked with selector: {selector}")
-                        start_clicked = True
+                    end_day_button = right_calendar.find_element(By.XPATH, selector)
+                    if end_day_button.is_displayed():
+                        end_day_button.click()
+                        logging.info(f"✓ End date clicked in RIGHT calendar with selector: {selector}")
+                        end_clicked = True
+                        end_index = index
                         break
                 except Exception as e:
-                    logging.debug(f"Start selector '{selector}' doesn't work: {e}")
+                    logging.debug(f"End selector '{selector}' doesn't work in right calendar: {e}")
                     continue
-            
-            if not start_clicked:
-                logging.error(f"Could not click start date (day {start_day}) with any selector")
-            
-            # STEP 2: Click on end date (Saturday = day 15 in RIGHT calendar)
-            logging.info(f"Trying to click end date: day {end_day} in RIGHT calendar")
-            end_clicked = False
-            
-            # First: find all calendars on the page
+            selector_cache.record(cache_file(), LOOKER_URL, 'end_day', end_index)
+        else:
+            logging.warning(f"Expected 2 calendars but found {len(all_calendars)}")
+    
+    except Exception as e:
+        logging.warning(f"Could not find calendars: {e}")
+    
+    # Fallback: try global selectors (if right calendar approach doesn't work)
+    if not end_clicked:
+        logging.info("Right calendar method didn't work, try global selectors...")
+        end_selectors = [
+            f"//button[@aria-label='{end_month} {end_day}, {end_date.year}']",
+            f"//button[@aria-label='{end_month[:3]} {end_day}, {end_date.year}']",
+        ]
+        
+        for selector in end_selectors:
             try:
-                all_calendars = driver.find_elements(By.XPATH, "//div[contains(@class, 'mat-calendar-content')]")
-                logging.info(f"Found {len(all_calendars)} calendars")
+                # Find ALL buttons with this day
+                all_day_buttons = driver.find_elements(By.XPATH, selector)
+                logging.info(f"Found {len(all_day_buttons)} buttons for day {end_day}")
                 
-                if len(all_calendars) >= 2:
-                    # There are 2 calendars - use the SECOND (right) for end date
-                    right_calendar = all_calendars[1]
-                    logging.info("Searching in right calendar for end date...")
-                    
-                    # Search day-button WITHIN the right calendar
-                    end_selectors_in_calendar = [
-                        f".//button[@aria-label='{end_month} {end_day}, {last_saturday.year}']",
-                        f".//button[@aria-label='{end_month[:3]} {end_day}, {last_saturday.year}']",
-                        f".//div[contains(@class, 'mat-calendar-body-cell-content') and text()='{end_day}']",
-                        f".//button[contains(@class, 'mat-calendar-body-cell') and .//div[text()='{end_day}']]",
-                        f".//button[contains(., '{end_day}') and not(contains(@class, 'mat-calendar-body-disabled'))]",
-                    ]
-                    
-                    for selector in end_selectors_in_calendar:
-                        try:
-                            end_day_button = right_calendar.find_element(By.XPATH, selector)
-                            if end_day_button.is_displayed():
-                                end_day_button.click()
-                                time.sleep(1)
-                                logging.info(f"✓ End date clicked in RIGHT calendar with selector: {selector}")
-                                end_clicked = True
-                                break
-                        except Exception as e:
-                            logging.debug(f"End selector '{selector}' doesn't work in right calendar: {e}")
-                            continue
-                else:
-                    logging.warning(f"Expected 2 calendars but found {len(all_calendars)}")
-                    
+                # Click on the SECOND (right calendar)
+                if len(all_day_buttons) >= 2:
+                    all_day_buttons[1].click()  # Index 1 = second calendar
+                    logging.info(f"✓ End date clicked (second button) with selector: {selector}")
+                    end_clicked = True
+                    break
+                elif len(all_day_buttons) == 1:
+                    all_day_buttons[0].click()
+                    logging.info(f"✓ End date clicked (only button) with selector: {selector}")
+                    end_clicked = True
+                    break
             except Exception as e:
-                logging.warning(f"Could not find calendars: {e}")
+                logging.debug(f"Global selector '{selector}' doesn't work: {e}")
+                continue
+    
+    if not end_clicked:
+        logging.error(f"Could not click end date (day {end_day}) with any method")
+    
+    return start_clicked and end_clicked
+
+@phase_metrics.timed('date_selection')
+def select_date_range(driver, start_date, end_date, strict=False):
+    """
+    Select start_date - end_date in the dashboard's date picker and apply it
+    Returns True if both dates were set (typed or clicked) and the range was applied
+    A range read back from the picker inputs or the date control must match;
+    strict: also False if the range could not be read back at all
+    """
+    start_date_str = format_picker_date(start_date)  # "Nov 10, 2025"
+    end_date_str = format_picker_date(end_date)  # "Nov 16, 2025"
+    
+    logging.info(f"Period: {start_date_str} - {end_date_str}")
+    
+    applied = False
+    confirmed = False
+    try:
+        # Click on date range selector to open calendars
+        date_selector = WebDriverWait(driver, 20).until(
+            EC.element_to_be_clickable((By.XPATH, "//div[contains(@class, 'date') or contains(@aria-label, 'date') or contains(@class, 'date-range')]"))
+        )
+        date_selector.click()
+        wait_until(visible(driver, By.XPATH, CALENDAR_XPATH), 10, "date picker calendars", required=False)
+        
+        # Screenshot AFTER clicking on date selector
+        debug_artifacts.capture(driver, "date_menu_after_click", OUTPUT_FOLDER)
+        
+        # Fast path: type the dates into the picker's start/end inputs (no calendar
+        # navigation, works for any month); click the calendar days if that fails
+        selected = type_date_range(driver, start_date, end_date)
+        confirmed = selected
+        if not selected:
+            logging.info("Typing the dates did not work, clicking the calendar days...")
+            selected = click_date_range(driver, start_date, end_date)
             
-            # Fallback: try global selectors (if right calendar approach doesn't work)
-            if not end_clicked:
-                logging.info("Right calendar method didn't work, try global selectors...")
-                end_selectors = [
-                    f"//button[@aria-label='{end_month} {end_day}, {last_saturday.year}']",
-                    f"//button[@aria-label='{end_month[:3]} {end_day}, {last_saturday.year}']",
-                ]
-                
-                for selector in end_selectors:
-                    try:
-                        # Find ALL buttons with this day
-                        all_day_buttons = driver.find_elements(By.XPATH, selector)
-                        logging.info(f"Found {len(all_day_buttons)} buttons for day {end_day}")
-                        
-                        # Click on the SECOND (right calendar)
-                        if len(all_day_buttons) >= 2:
-                            all_day_buttons[1].click()  # Index 1 = second calendar
-                            time.sleep(1)
-                            logging.info(f"✓ End date clicked (second button) with selector: {selector}")
-                            end_clicked = True
-                            break
-                        elif len(all_day_buttons) == 1:
-                            all_day_buttons[0].click()
-                            time.sleep(1)
-                            logging.info(f"✓ End date clicked (only button) with selector: {selector}")
-                            end_clicked = True
-                            break
-                    except Exception as e:
-                        logging.debug(f"Global selector '{selector}' doesn't work: {e}")
-                        continue
+            # The day-number selectors click that day in whatever month is shown
+            shown = picker_input_range(driver)
+            if shown and shown != (start_date, end_date):
+                logging.error(f"Picker shows {shown[0]} - {shown[1]} instead of the requested dates")
+                selected = False
+            confirmed = shown == (start_date, end_date)
+        
+        # Screenshot AFTER date selection
+        debug_artifacts.capture(driver, "after_date_selection", OUTPUT_FOLDER)
+        
+        # STEP 3: Click Apply button
+        try:
+            apply_button = WebDriverWait(driver, 5).until(
+                EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), 'Apply') or contains(., 'Apply')]"))
+            )
+            apply_button.click()
+            applied = selected
+            logging.info(f"✓ Apply button clicked, dates applied: {start_date_str} - {end_date_str}")
             
-            if not end_clicked:
-                logging.error(f"Could not click end date (day {end_day}) with any method")
+            # IMPORTANT: Wait until the table has reloaded with new data
+            logging.info("Waiting for table reload with new data...")
+            wait_until(gone(driver, By.XPATH, CALENDAR_XPATH), 10, "date picker closed", required=False)
+            wait_for_table_render(driver, TABLE_QUIET_SECONDS, PAGE_TIMEOUT, first_quiet_seconds=TABLE_RELOAD_GRACE)
             
-            # Screenshot AFTER date selection
-            after_date_screenshot = os.path.join(OUTPUT_FOLDER, "after_date_selection.png")
-            driver.save_screenshot(after_date_screenshot)
-            logging.info(f"Screenshot after date selection: {after_date_screenshot}")
+            # Screenshot AFTER data reload
+            debug_artifacts.capture(driver, "after_data_reload", OUTPUT_FOLDER)
             
-            # STEP 3: Click Apply button
+            # Read back the range the dashboard actually uses
+            shown = control_date_range(date_selector)
+            if shown and shown != (start_date, end_date):
+                logging.error(f"Dashboard shows {shown[0]} - {shown[1]} instead of the requested dates")
+                applied = False
+            confirmed = confirmed or shown == (start_date, end_date)
+            if applied and strict and not confirmed:
+                logging.error("Could not confirm the applied date range")
+                applied = False
+        
+        except Exception as e:
+            logging.warning(f"Could not find/click Apply button: {e}")
+            # Try pressing ESC to close calendar
             try:
-                apply_button = WebDriverWait(driver, 5).until(
-                    EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), 'Apply') or contains(., 'Apply')]"))
-                )
-                apply_button.click()
-                logging.info(f"✓ Apply button clicked, dates applied: {start_date_str} - {end_date_str}")
-                
-                # IMPORTANT: Wait long enough for the table to reload with new data
-                logging.info("Waiting for table reload with new data (20 seconds)...")
-                time.sleep(20)
-                
-                # Try to wait until loading indicator disappears
-                try:
-                    logging.info("Checking if loading indicator is present...")
-                    # Wait until any loading spinners are gone
-                    WebDriverWait(driver, 30).until_not(
-                        EC.presence_of_element_located((By.XPATH, "//*[contains(@class, 'loading') or contains(@class, 'spinner') or contains(@class, 'progress')]"))
-                    )
-                    logging.info("✓ Loading indicator disappeared")
-                except:
-                    logging.info("No loading indicator found (or already gone)")
-                
-                # Extra wait time for safety
-                time.sleep(5)
-                
-                # Screenshot AFTER data reload
-                after_reload_screenshot = os.path.join(OUTPUT_FOLDER, "after_data_reload.png")
-                driver.save_screenshot(after_reload_screenshot)
-                logging.info(f"Screenshot after data reload: {after_reload_screenshot}")
+                driver.find_element(By.TAG_NAME, "body").send_keys(Keys.ESCAPE)
+                wait_until(gone(driver, By.XPATH, CALENDAR_XPATH), 5, "date picker closed", required=False)
+                logging.info("ESC pressed to close calendar")
+            except:
+                pass
+    
+    except Exception as e:
+        logging.warning(f"Could not select dates (dashboard might already use the right period): {e}")
+    
+    return applied
+
+def open_export_menu(driver, button, idx):
+    """
+    Click a header button and, if its menu has the Export option, click that
+    Returns True once the export dialog was requested, False (menu closed again) otherwise
+    """
+    try:
+        button.click()
+    except ElementNotInteractableException:
+        # Still hidden (no hover state): a script click opens the menu anyway
+        driver.execute_script("arguments[0].click();", button)
+    logging.info(f"  Button #{idx+1} clicked")
+    
+    # Search for Export data with multiple variants
+    export_found = False
+    export_selectors = [
+        "//*[text()='Export data']",
+        "//*[contains(text(), 'Export')]",
+        "//button[contains(., 'Export')]",
+        "//div[contains(., 'Export data')]",
+        "//*[@aria-label='Export data']"
+    ]
+    
+    export_selectors = selector_cache.ordered(cache_file(), LOOKER_URL, 'export_option', export_selectors)
+    
+    # Wait for the menu (or directly the Export option) to appear
+    wait_until(any_visible(driver, [(By.XPATH, MENU_XPATH)] + [(By.XPATH, s) for _, s in export_selectors]),
+               MENU_TIMEOUT, "menu", required=False)
+    
+    for index, selector in export_selectors:
+        try:
+            export_data = driver.find_element(By.XPATH, selector)
+            if export_data.is_displayed():
+                logging.info(f"Export option found with selector: {selector}")
+                export_found = True
+                selector_cache.record(cache_file(), LOOKER_URL, 'export_option', index)
+                selector_cache.record(cache_file(), LOOKER_URL, 'menu_button', idx)
                 
+                # Click on Export
+                logging.info("Clicking on 'Export'...")
+                export_data.click()
+                wait_until(visible(driver, By.XPATH, DIALOG_XPATH), 10, "export dialog",
+                           required=False)
+                break
+        except:
+            continue
+    
+    if export_found:
+        return True
+    
+    logging.info(f"  Button #{idx+1} has no Export option")
+    # Screenshot of menu
+    debug_artifacts.capture(driver, f"menu_button{idx+1}", OUTPUT_FOLDER)
+    
+    # Close menu
+    try:
+        driver.find_element(By.TAG_NAME, "body").click()
+        wait_until(gone(driver, By.XPATH, MENU_XPATH), MENU_TIMEOUT, "menu closed",
+                   required=False)
+    except:
+        pass
+    
+    return False
+    
+def find_menu_button(buttons):
+    """
+    Pick the chart's more-options (3-dot) button from the described header buttons
+    By aria-label/icon/class first, else the right-most button that is not the filter
+    Returns (index, description), or (None, None) if the header has no such button
+    """
+    candidates = [(idx, info) for idx, info in enumerate(buttons)
+                  if 'filter' not in f"{info['aria']} {info['text']}".lower()]
+    
+    for idx, info in candidates:
+        label = f"{info['aria']} {info['text']} {info['classes']}".lower()
+        if any(marker in label for marker in MORE_OPTIONS_MARKERS):
+            return idx, info
+    
+    # The 3-dots are the last control of the header (hidden buttons: DOM order)
+    if candidates:
+        return max(candidates, key=lambda pair: (pair[1]['rect']['x'] + pair[1]['rect']['width'], pair[0]))
+    return None, None
+    
+def open_menu_directly(driver, header_info):
+    """
+    Locate the more-options button from the header's DOM and geometry, reveal it
+    with one hover at its position and open its menu - returns True if Export was chosen
+    """
+    header = header_info['element']
+    _, buttons = describe_elements(driver, ".//button", within=header)
+    idx, info = find_menu_button(buttons)
+    if info is None:
+        logging.info("No more-options button in the header DOM")
+        return False
+    logging.info(f"More-options button: #{idx+1} {format_element(info)}")
+    
+    # One hover: on the button if it has a box already, else on the header's right end
+    # (offsets are from the header's center)
+    header_rect, rect = header_info['rect'], info['rect']
+    if rect['width'] and rect['height']:
+        x = rect['x'] + rect['width'] / 2
+        y = rect['y'] + rect['height'] / 2
+    else:
+        x = header_rect['x'] + header_rect['width'] - MENU_BUTTON_INSET
+        y = header_rect['y'] + header_rect['height'] / 2
+    x_offset = int(x - (header_rect['x'] + header_rect['width'] / 2))
+    y_offset = int(y - (header_rect['y'] + header_rect['height'] / 2))
+    ActionChains(driver).move_to_element_with_offset(header, x_offset, y_offset).perform()
+    
+    button = info['element']
+    wait_until(lambda: button.is_displayed(), MENU_TIMEOUT, "more-options button visible", required=False)
+    
+    return open_export_menu(driver, button, idx)
+
+def open_menu_by_hover_search(driver, table, header):
+    """
+    Fallback: hover a grid of positions top-right in the table, force the hover
+    state with JavaScript and try every header button - returns True if Export was chosen
+    """
+    # Hover strategy: top-right IN the table (where 3-dots are)
+    logging.info("Hovering top-right IN the table (where 3-dots are)...")
+    actions = ActionChains(driver)
+    
+    # Hover over the table
+    actions.move_to_element(table).perform()
+    header_buttons_visible = visible(driver, By.XPATH, HEADER_BUTTON_XPATH)
+    
+    # Get the size and position of the table
+    try:
+        size = table.size
+        width = size['width']
+        height = size['height']
+        
+        logging.info(f"Table size: {width}x{height}")
+        
+        # Hover top-right IN the table - where the 3-dots appear
+        # Try different positions top-right, until the header buttons show up
+        positions = [(x_offset, y_offset) for x_offset in [width - 80, width - 100, width - 120, width - 150]
+                     for y_offset in [10, 20, 30, 40]]
+        for x_offset, y_offset in positions:
+            try:
+                actions.move_to_element_with_offset(table, x_offset, y_offset).perform()
+                logging.info(f"  Hover position: x={x_offset}, y={y_offset}")
             except Exception as e:
-                logging.warning(f"Could not find/click Apply button: {e}")
-                # Try pressing ESC to close calendar
-                try:
-                    from selenium.webdriver.common.keys import Keys
-                    driver.find_element(By.TAG_NAME, "body").send_keys(Keys.ESCAPE)
-                    time.sleep(2)
-                    logging.info("ESC pressed to close calendar")
-                except:
-                    pass
-                
-        except Exception as e:
-            logging.warning(f"Could not select dates (dashboard might already use the right period): {e}")
+                logging.warning(f"  Hover failed at {x_offset},{y_offset}: {e}")
+                continue
+            
+            if wait_until(header_buttons_visible, 0.3, "header buttons", required=False):
+                break
         
-        # Search for the table/chart container first
-        logging.info("Searching for table...")
-        time.sleep(3)
+        logging.info("Hover over table top-right executed")
+    
+    except Exception as e:
+        logging.warning(f"Could not hover with offset: {e}")
+    
+    # Search for buttons in the ng2-component-header (where the 3-dots are)
+    logging.info("Searching for buttons in ng2-component-header...")
+    
+    # Try to force hover state with JavaScript
+    logging.info("Forcing hover state with JavaScript...")
+    driver.execute_script("""
+        arguments[0].classList.add('hover');
+        arguments[0].classList.add('mat-hover');
+        
+        // Trigger mouse events
+        var event = new MouseEvent('mouseenter', {bubbles: true, cancelable: true});
+        arguments[0].dispatchEvent(event);
+        
+        var event2 = new MouseEvent('mouseover', {bubbles: true, cancelable: true});
+        arguments[0].dispatchEvent(event2);
+    """, header)
+    
+    wait_until(visible(driver, By.XPATH, ".//button", within=header), MENU_TIMEOUT, "header buttons visible",
+               required=False)
+    
+    # Now search for buttons (including hidden but in DOM)
+    # (one script call describes all buttons: tag, classes, aria-label, visibility, position)
+    _, header_buttons = describe_elements(driver, ".//button", within=header)
+    logging.info(f"Found {len(header_buttons)} buttons in header (including hidden)")
+    
+    # Log all buttons (even if not visible - we'll try them anyway)
+    for idx, info in enumerate(header_buttons):
+        logging.info(f"  Button {idx}: {format_element(info)}")
+    
+    # Screenshot AFTER hover
+    debug_artifacts.capture(driver, "after_hover", OUTPUT_FOLDER)
+    
+    if not header_buttons:
+        logging.error("No buttons found in header DOM at all")
+        return False
+    
+    # Try each button
+    logging.info(f"Trying {len(header_buttons)} buttons...")
+    for idx, info in selector_cache.ordered(cache_file(), LOOKER_URL, 'menu_button', header_buttons):
+        button = info['element']
+        try:
+            aria_label = info['aria']
+            logging.info(f"Trying button #{idx+1} (aria: '{aria_label[:50]}')")
+            
+            # Skip filter button
+            if 'filter' in aria_label.lower():
+                logging.info(f"  Skipping - this is the filter button")
+                continue
+            
+            # Extra hover for this specific button
+            ActionChains(driver).move_to_element(button).perform()
+                
+            if open_export_menu(driver, button, idx):
+                return True
         
+        except Exception as e:
+            logging.warning(f"  Error with button #{idx+1}: {e}")
+            continue
+    
+    return False
+
+def export_table(driver):
+    """Open the table's menu, choose Export data and start the CSV export"""
+    # Search for the table/chart container first
+    logging.info("Searching for table...")
+    
+    with phase_metrics.span('table_locate'):
         # Close any overlay/dialogs first
         try:
             close_buttons = driver.find_elements(By.XPATH, "//button[contains(text(), 'Cancel') or contains(text(), 'Close') or contains(@aria-label, 'Close')]")
             for btn in close_buttons:
                 if btn.is_displayed():
                     btn.click()
-                    time.sleep(1)
+                    wait_until(gone(driver, By.CLASS_NAME, "cdk-overlay-backdrop"), MENU_TIMEOUT, "overlay closed",
+                               required=False)
                     logging.info("Overlay closed")
                     break
         except:
@@ -516,211 +929,67 @@ def download_looker_data():
             backdrop = driver.find_element(By.CLASS_NAME, "cdk-overlay-backdrop")
             if backdrop.is_displayed():
                 backdrop.click()
-                time.sleep(1)
+                wait_until(gone(driver, By.CLASS_NAME, "cdk-overlay-backdrop"), MENU_TIMEOUT, "backdrop closed",
+                           required=False)
                 logging.info("Backdrop clicked")
         except:
             pass
-        
+    
         # Find the table (Looker Studio uses ng2-canvas-component)
         table = None
         try:
-            table = driver.find_element(By.XPATH, "//ng2-canvas-component[contains(@class, 'simple-table')]")
+            table = driver.find_element(By.XPATH, TABLE_XPATH)
             logging.info("Looker Studio table component found!")
         except:
             try:
-                table = driver.find_element(By.XPATH, "//ng2-component-header[contains(@class, 'simple-table')]")
+                table = driver.find_element(By.XPATH, HEADER_XPATH)
                 logging.info("Looker Studio header component found!")
             except:
                 logging.error("No Looker Studio table component found")
                 raise Exception("Table component not found")
-        
+    
         # Scroll to the table AND wait until it's fully visible
         logging.info("Scrolling to table and waiting until fully loaded...")
-        driver.execute_script("arguments[0].scrollIntoView({block: 'center', behavior: 'smooth'});", table)
-        time.sleep(3)
+        driver.execute_script("arguments[0].scrollIntoView({block: 'center', behavior: 'instant'});", table)
+        wait_until(in_viewport(driver, table), 5, "table in view", required=False)
         
         # Check once more if there are no loading indicators
-        try:
-            loading_elements = driver.find_elements(By.XPATH, "//*[contains(@class, 'loading') or contains(@class, 'spinner')]")
-            visible_loaders = [elem for elem in loading_elements if elem.is_displayed()]
-            if visible_loaders:
-                logging.info(f"Still {len(visible_loaders)} loading indicators visible, waiting...")
-                time.sleep(10)
-        except:
-            pass
+        wait_for_table_render(driver, TABLE_QUIET_SECONDS, PAGE_TIMEOUT)
         
         # Screenshot of the table BEFORE hovering
-        table_before_hover = os.path.join(OUTPUT_FOLDER, "table_before_hover.png")
-        driver.save_screenshot(table_before_hover)
-        logging.info(f"Screenshot of table before hover: {table_before_hover}")
-        
-        # Hover strategy: top-right IN the table (where 3-dots are)
-        logging.info("Hovering top-right IN the table (where 3-dots are)...")
-        actions = ActionChains(driver)
-        
-        # Hover over the table
-        actions.move_to_element(table).perform()
-        time.sleep(1)
-        
-        # Get the size and position of the table
-        try:
-            size = table.size
-            width = size['width']
-            height = size['height']
-            
-            logging.info(f"Table size: {width}x{height}")
-            
-            # Hover top-right IN the table - where the 3-dots appear
-            # Try different positions top-right
-            for x_offset in [width - 80, width - 100, width - 120, width - 150]:
-                for y_offset in [10, 20, 30, 40]:
-                    try:
-                        actions.move_to_element_with_offset(table, x_offset, y_offset).perform()
-                        time.sleep(0.5)
-                        logging.info(f"  Hover position: x={x_offset}, y={y_offset}")
-                    except Exception as e:
-                        logging.warning(f"  Hover failed at {x_offset},{y_offset}: {e}")
-            
-            time.sleep(2)
-            logging.info("Hover over table top-right executed")
-            
-        except Exception as e:
-            logging.warning(f"Could not hover with offset: {e}")
-        
-        # Search for buttons in the ng2-component-header (where the 3-dots are)
-        logging.info("Searching for buttons in ng2-component-header...")
+        debug_artifacts.capture(driver, "table_before_hover", OUTPUT_FOLDER)
         
-        export_data_found = False
-        
-        # Find the header component
+        # Find the header component (where the 3-dots are)
+        _, headers = describe_elements(driver, HEADER_XPATH)
+        if not headers:
+            logging.error("Could not find ng2-component-header")
+            raise Exception("Header not found")
+        header_info = headers[0]
+    
+    with phase_metrics.span('menu_search'):
+        # Direct: the more-options button from the header's DOM and geometry, one hover
+        logging.info("Targeting the table's more-options button directly...")
         try:
-            header = driver.find_element(By.XPATH, "//ng2-component-header[contains(@class, 'simple-table')]")
+            export_data_found = open_menu_directly(driver, header_info)
         except Exception as e:
-            logging.error(f"Could not find ng2-component-header: {e}")
-            raise Exception("Header not found")
-        
-        # Try to force hover state with JavaScript
-        logging.info("Forcing hover state with JavaScript...")
-        driver.execute_script("""
-            arguments[0].classList.add('hover');
-            arguments[0].classList.add('mat-hover');
-            
-            // Trigger mouse events
-            var event = new MouseEvent('mouseenter', {bubbles: true, cancelable: true});
-            arguments[0].dispatchEvent(event);
-            
-            var event2 = new MouseEvent('mouseover', {bubbles: true, cancelable: true});
-            arguments[0].dispatchEvent(event2);
-        """, header)
-        
-        time.sleep(2)
-        
-        # Now search for buttons (including hidden but in DOM)
-        all_buttons_in_header = header.find_elements(By.XPATH, ".//button")
-        logging.info(f"Found {len(all_buttons_in_header)} buttons in header (including hidden)")
-        
-        # Log all buttons
-        header_buttons = []
-        for idx, btn in enumerate(all_buttons_in_header):
-            aria_label = btn.get_attribute('aria-label') or ''
-            class_name = btn.get_attribute('class') or ''
-            is_displayed = btn.is_displayed()
-            logging.info(f"  Button {idx}: visible={is_displayed}, aria='{aria_label[:50]}', class='{class_name[:50]}'")
-            
-            # Add (even if not visible - we'll try them anyway)
-            header_buttons.append(btn)
-        
-        # Screenshot AFTER hover
-        screenshot_path = os.path.join(OUTPUT_FOLDER, "after_hover.png")
-        driver.save_screenshot(screenshot_path)
-        logging.info(f"Screenshot after hover: {screenshot_path}")
-        
-        if not header_buttons:
-            logging.error("No buttons found in header DOM at all")
-            raise Exception("No buttons in header DOM")
-        
-        # Try each button
-        logging.info(f"Trying {len(header_buttons)} buttons...")
-        for idx, button in enumerate(header_buttons):
-            try:
-                aria_label = button.get_attribute('aria-label') or ''
-                logging.info(f"Trying button #{idx+1} (aria: '{aria_label[:50]}')")
-                
-                # Skip filter button
-                if 'filter' in aria_label.lower():
-                    logging.info(f"  Skipping - this is the filter button")
-                    continue
-                
-                # Try click
-                try:
-                    # Extra hover for this specific button
-                    actions = ActionChains(driver)
-                    actions.move_to_element(button).perform()
-                    time.sleep(1)
-                    
-                    button.click()
-                    logging.info(f"  Button #{idx+1} clicked")
-                    time.sleep(3)  # Extra wait time for menu
-                    
-                    # Search for Export data with multiple variants
-                    export_found = False
-                    export_selectors = [
-                        "//*[text()='Export data']",
-                        "//*[contains(text(), 'Export')]",
-                        "//button[contains(., 'Export')]",
-                        "//div[contains(., 'Export data')]",
-                        "//*[@aria-label='Export data']"
-                    ]
-                    
-                    for selector in export_selectors:
-                        try:
-                            export_data = driver.find_element(By.XPATH, selector)
-                            if export_data.is_displayed():
-                                logging.info(f"Export option found with selector: {selector}")
-                                export_found = True
-                                export_data_found = True
-                                
-                                # Click on Export
-                                logging.info("Clicking on 'Export'...")
-                                export_data.click()
-                                time.sleep(2)
-                                break
-                        except:
-                            continue
-                    
-                    if export_found:
-                        break
-                    else:
-                        logging.info(f"  Button #{idx+1} has no Export option")
-                        # Screenshot of menu
-                        menu_screenshot = os.path.join(OUTPUT_FOLDER, f"menu_button{idx+1}.png")
-                        driver.save_screenshot(menu_screenshot)
-                        logging.info(f"  Menu screenshot: {menu_screenshot}")
-                        
-                        # Close menu
-                        try:
-                            driver.find_element(By.TAG_NAME, "body").click()
-                            time.sleep(1)
-                        except:
-                            pass
-                        
-                except Exception as e:
-                    logging.warning(f"  Error with button #{idx+1}: {e}")
-                    continue
-                    
-            except Exception as e:
-                logging.warning(f"  Error with button #{idx+1}: {e}")
-                continue
-        
+            logging.warning(f"Direct targeting failed: {e}")
+            export_data_found = False
+    
+        # Last resort: hover search over the table's top-right corner
         if not export_data_found:
-            screenshot_path = os.path.join(OUTPUT_FOLDER, "debug_no_export_data.png")
-            driver.save_screenshot(screenshot_path)
-            logging.error(f"'Export data' not found in any menu. Screenshot: {screenshot_path}")
-            raise Exception("'Export data' not found")
-        
+            logging.info("Direct targeting did not reach 'Export data', falling back to hover search...")
+            export_data_found = open_menu_by_hover_search(driver, table, header_info['element'])
+    
+    if not export_data_found:
+        selector_cache.record(cache_file(), LOOKER_URL, 'menu_button', None)
+        debug_artifacts.capture(driver, "debug_no_export_data", OUTPUT_FOLDER)
+        logging.error("'Export data' not found in any menu")
+        raise Exception("'Export data' not found")
+    
+    with phase_metrics.span('export_dialog'):
         # CSV is default already selected, check "Keep value formatting"
         logging.info("Checking 'Keep value formatting'...")
-        
+    
         try:
             # Find the checkbox for "Keep value formatting"
             keep_formatting_selectors = [
@@ -728,67 +997,297 @@ def download_looker_data():
                 "//mat-checkbox[contains(., 'Keep value formatting')]",
                 "//*[contains(text(), 'Keep value formatting')]",
             ]
-            
-            for selector in keep_formatting_selectors:
+        
+            keep_formatting_index = None
+            for index, selector in selector_cache.ordered(cache_file(), LOOKER_URL, 'keep_formatting',
+                                                          keep_formatting_selectors):
                 try:
                     keep_formatting = driver.find_element(By.XPATH, selector)
                     keep_formatting.click()
-                    time.sleep(1)
                     logging.info(f"'Keep value formatting' checked with: {selector}")
+                    keep_formatting_index = index
                     break
                 except:
                     continue
+            selector_cache.record(cache_file(), LOOKER_URL, 'keep_formatting', keep_formatting_index)
         except Exception as e:
             logging.warning(f"Could not check 'Keep value formatting': {e}")
-        
+    
         # Click on "Export" button
         logging.info("Clicking on 'Export' button in dialog...")
         export_button = WebDriverWait(driver, 10).until(
             EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), 'Export') or contains(., 'Export')]"))
         )
         export_button.click()
+
+def export_week(driver, sunday, strict=False):
+    """
+    Select one week (Sunday to Saturday) in the loaded dashboard, export it and
+    save it as data_weekXX_YYYY.csv - returns (path, changed)
+    strict: fail if the date range could not be selected (instead of exporting
+    whatever period the dashboard shows)
+    """
+    week_num, year = get_week_of(sunday)
+    start_date, end_date = sunday, sunday + timedelta(days=6)
+    logging.info(f"--- Week {week_num}/{year}: {start_date.strftime('%A %d %B %Y')} - {end_date.strftime('%A %d %B %Y')} ---")
+    
+    if not select_date_range(driver, start_date, end_date, strict) and strict:
+        raise Exception(f"Could not select the dates of week {week_num}/{year}")
+    
+    # Only a file that appears after the export counts as this week's download
+    export_started = time.time()
+    export_table(driver)
+    
+    # Wait for download
+    logging.info("Download started, waiting for completion...")
+    downloaded_file = wait_for_download(DOWNLOAD_FILE_PATTERN, timeout=60, newer_than=export_started)
+    
+    selector_cache.log_stats()
+    
+    # Rename and move file
+    return save_week_file(downloaded_file, week_num, year)
+
+@phase_metrics.timed('consolidation')
+def run_consolidation():
+    """Combine the weekly files into the master store (failure is not critical)"""
+    try:
+        logging.info("Starting automatic file combination...")
+        import consolidate_weekly_data
+        if CONSOLIDATE_FOLDER:
+            consolidate_weekly_data.set_data_folder(CONSOLIDATE_FOLDER)
+        consolidate_weekly_data.consolidate_weekly_data()
+    except Exception as e:
+        logging.warning(f"Could not run automatic combination (not critical): {e}")
+
+@phase_metrics.timed_run('download', lambda: OUTPUT_FOLDER)
+def download_looker_data():
+    """Main function to download Looker Studio data"""
+    driver = None
+    
+    try:
+        logging.info("=== Start Looker Studio Download ===")
         
-        # Wait for download
-        logging.info("Download started, waiting for completion...")
-        downloaded_file = wait_for_download(DOWNLOAD_FILE_PATTERN, timeout=60)
+        # Check if output folder exists
+        os.makedirs(OUTPUT_FOLDER, exist_ok=True)
         
-        # Rename and move file
-        week_num, year = get_week_number()
-        new_filename = f"data_week{week_num:02d}_{year}.csv"
-        new_filepath = os.path.join(OUTPUT_FOLDER, new_filename)
+        # Setup driver
+        logging.info("Starting Chrome browser...")
+        driver = setup_chrome_driver()
         
-        # FIX: Check if destination file already exists and remove it first
-        if os.path.exists(new_filepath):
-            logging.info(f"Existing file found, removing: {new_filepath}")
-            os.remove(new_filepath)
+        open_dashboard(driver)
         
-        # Move and rename
-        os.rename(downloaded_file, new_filepath)
-        logging.info(f"File saved as: {new_filepath}")
+        # Select dates: Sunday to Saturday of previous week
+        logging.info("Selecting dates (Sunday to Saturday of previous week)...")
+        logging.info(f"Today: {datetime.now().strftime('%A %d %B %Y')}")
+        new_filepath, changed = export_week(driver, get_last_week_sunday())
         
         logging.info("=== Download Successfully Completed ===")
         
+        # Same content as before: nothing to consolidate
+        if not changed:
+            logging.info("Week data unchanged, skipping file combination")
+            return True
+        
         # Optional: Automatically combine weekly files into master file
-        try:
-            logging.info("Starting automatic file combination...")
-            import consolidate_weekly_data
-            consolidate_weekly_data.consolidate_weekly_data()
-        except Exception as e:
-            logging.warning(f"Could not run automatic combination (not critical): {e}")
+        run_consolidation()
         
         return True
         
     except Exception as e:
         logging.error(f"ERROR during download: {str(e)}", exc_info=True)
+        debug_artifacts.flush("download failed")
         return False
         
     finally:
         if driver:
             logging.info("Closing browser...")
-            driver.quit()
+            quit_driver(driver)
+        debug_artifacts.drain()
+
+@phase_metrics.timed_run('backfill', lambda: OUTPUT_FOLDER)
+def backfill_weeks(sundays, retries=BACKFILL_RETRIES, skip_existing=False):
+    """
+    Download several weeks with one browser and one loaded dashboard
+    A failed week is retried (after reloading the dashboard) without restarting
+    Chrome; consolidation runs once at the end. Returns True if all weeks succeeded
+    """
+    driver = None
+    failed = []
+    changed_weeks = 0
+    
+    try:
+        logging.info(f"=== Start Looker Studio Backfill: {len(sundays)} weeks ===")
+        os.makedirs(OUTPUT_FOLDER, exist_ok=True)
+        
+        if skip_existing:
+            sundays = [sunday for sunday in sundays
+                       if not os.path.exists(os.path.join(OUTPUT_FOLDER, "data_week{:02d}_{}.csv".format(*get_week_of(sunday))))]
+            logging.info(f"{len(sundays)} weeks without a weekly file yet")
+        
+        logging.info("Starting Chrome browser...")
+        driver = setup_chrome_driver()
+        open_dashboard(driver)
+        
+        for sunday in sundays:
+            week_num, year = get_week_of(sunday)
+            for attempt in range(1, retries + 2):
+                try:
+                    _, changed = export_week(driver, sunday, strict=True)
+                    changed_weeks += changed
+                    # A later failure should only write that week's screenshots
+                    debug_artifacts.clear()
+                    break
+                except Exception as e:
+                    logging.warning(f"Week {week_num}/{year} failed (attempt {attempt}/{retries + 1}): {e}")
+                    debug_artifacts.flush(f"week {week_num}/{year}, attempt {attempt}")
+                    if attempt > retries:
+                        failed.append((week_num, year))
+                        break
+                    
+                    # Start the retry from a freshly loaded dashboard (same browser)
+                    try:
+                        open_dashboard(driver)
+                    except Exception as reload_error:
+                        logging.warning(f"Could not reload dashboard: {reload_error}")
+        
+        logging.info(f"Backfill done: {len(sundays) - len(failed)} of {len(sundays)} weeks downloaded, "
+                     f"{changed_weeks} new or changed")
+        if failed:
+            logging.error(f"Failed weeks: {', '.join(f'{week_num}/{year}' for week_num, year in failed)}")
+    
+    except Exception as e:
+        logging.error(f"ERROR during backfill: {str(e)}", exc_info=True)
+        debug_artifacts.flush("backfill failed")
+        return False
+    
+    finally:
+        if driver:
+            logging.info("Closing browser...")
+            quit_driver(driver)
+        debug_artifacts.drain()
+    
+    if changed_weeks:
+        run_consolidation()
+    
+    return not failed
+
+def set_report(url, output_folder, file_pattern=None):
+    """
+    Point the download at another report and output folder
+    Resets all per-report state: a worker process runs several reports in turn
+    """
+    global LOOKER_URL, OUTPUT_FOLDER, CONSOLIDATE_FOLDER, DOWNLOAD_FILE_PATTERN
+    LOOKER_URL = url
+    OUTPUT_FOLDER = output_folder
+    CONSOLIDATE_FOLDER = output_folder
+    DOWNLOAD_FILE_PATTERN = file_pattern or DEFAULT_FILE_PATTERN
+    debug_artifacts.clear()
+    selector_cache.reset_stats()
+
+def clone_profile(source, target):
+    """Copy a Chrome profile (without caches and lock files), unless the clone already exists"""
+    if not os.path.isdir(target):
+        logging.info(f"Cloning Chrome profile to {target}")
+        shutil.copytree(source, target, ignore=shutil.ignore_patterns(
+            'Cache', 'Code Cache', 'GPUCache', 'Service Worker', 'Crashpad', 'Singleton*', 'lockfile'))
+    return target
+
+def init_browser_worker(slots, lean_mode=False, verbose=False):
+    """Worker process: take a free slot with its own profile clone and download folder"""
+    global CHROME_PROFILE_DIR, DOWNLOAD_FOLDER, LEAN_MODE
+    slot = slots.get()
+    LEAN_MODE = lean_mode
+    debug_artifacts.configure(verbose=verbose)
+    
+    worker_dir = os.path.join(WORKER_FOLDER, f"worker-{slot}")
+    DOWNLOAD_FOLDER = os.path.join(worker_dir, "downloads")
+    os.makedirs(DOWNLOAD_FOLDER, exist_ok=True)
+    CHROME_PROFILE_DIR = clone_profile(CHROME_PROFILE_DIR, os.path.join(worker_dir, "profile"))
+    
+    # Tell the workers apart in the shared log
+    for handler in logging.getLogger().handlers:
+        handler.setFormatter(logging.Formatter(f'%(asctime)s - %(levelname)s - [worker-{slot}] %(message)s'))
+
+def export_report(report, output_folder, sundays=None, retries=BACKFILL_RETRIES, skip_existing=False):
+    """Worker: download one report - the previous week, or the given weeks as a backfill"""
+    set_report(report['url'], output_folder, report.get('file_pattern'))
+    logging.info(f"Report '{report['name']}' -> {output_folder}")
+    
+    if sundays:
+        return backfill_weeks(sundays, retries, skip_existing)
+    return download_looker_data()
+
+def export_reports(reports, workers=MAX_BROWSERS, sundays=None, retries=BACKFILL_RETRIES, skip_existing=False):
+    """
+    Export several reports at the same time, one Chrome per worker process
+    Returns True if all reports succeeded
+    """
+    workers = max(1, min(workers, len(reports)))
+    folders = [os.path.join(OUTPUT_FOLDER, report['name']) for report in reports]
+    logging.info(f"=== Exporting {len(reports)} reports with {workers} browsers ===")
+    
+    # Each worker process takes one slot number (its profile clone and download folder)
+    slots = multiprocessing.Queue()
+    for slot in range(1, workers + 1):
+        slots.put(slot)
+    
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_browser_worker,
+                             initargs=(slots, LEAN_MODE, debug_artifacts.VERBOSE)) as executor:
+        results = list(executor.map(export_report, reports, folders, [sundays] * len(reports),
+                                    [retries] * len(reports), [skip_existing] * len(reports)))
+    
+    for report, success in zip(reports, results):
+        logging.info(f"  {'✓' if success else '✗'} {report['name']}")
+    
+    return all(results)
 
 if __name__ == "__main__":
-    success = download_looker_data()
+    parser = argparse.ArgumentParser(description="Download the weekly Looker Studio export")
+    parser.add_argument('--start', type=parse_week, metavar='YYYY-WW',
+                        help="Backfill: first week to download (one browser session for all weeks)")
+    parser.add_argument('--end', type=parse_week, metavar='YYYY-WW',
+                        help="Backfill: last week to download (default: previous week)")
+    parser.add_argument('--skip-existing', action='store_true',
+                        help="Backfill: skip weeks that already have a data_weekXX_YYYY.csv")
+    parser.add_argument('--retries', type=int, default=BACKFILL_RETRIES,
+                        help="Backfill: retries per failed week")
+    parser.add_argument('--reports', action='store_true',
+                        help="Export all REPORTS (in parallel) instead of LOOKER_URL")
+    parser.add_argument('--report', metavar='NAME',
+                        help="Export only this entry of REPORTS (e.g. one job of scheduler.py)")
+    parser.add_argument('--workers', type=int, default=MAX_BROWSERS,
+                        help="Number of reports exported at the same time (with --reports)")
+    parser.add_argument('--lean', dest='lean', action='store_true', default=LEAN_MODE,
+                        help="Headless Chrome without images, fonts and analytics (needs a logged-in profile)")
+    parser.add_argument('--no-lean', dest='lean', action='store_false', help="Normal Chrome window")
+    parser.add_argument('--verbose', action='store_true', default=VERBOSE_SCREENSHOTS,
+                        help="Write every debug screenshot (default: only after a failure)")
+    args = parser.parse_args()
+    LEAN_MODE = args.lean
+    debug_artifacts.configure(verbose=args.verbose)
+    
+    sundays = weeks_in_range(args.start, args.end or get_last_week_sunday()) if args.start else None
+    
+    if args.report:
+        report = next((report for report in REPORTS if report['name'] == args.report), None)
+        if not report:
+            parser.error(f"No report named '{args.report}' in REPORTS")
+        
+        # Own profile clone and download folder, so several --report runs (scheduler.py) can overlap
+        report_dir = os.path.join(WORKER_FOLDER, f"report-{report['name']}")
+        DOWNLOAD_FOLDER = os.path.join(report_dir, "downloads")
+        os.makedirs(DOWNLOAD_FOLDER, exist_ok=True)
+        CHROME_PROFILE_DIR = clone_profile(CHROME_PROFILE_DIR, os.path.join(report_dir, "profile"))
+        success = export_report(report, os.path.join(OUTPUT_FOLDER, report['name']), sundays,
+                                args.retries, args.skip_existing)
+    elif args.reports:
+        if not REPORTS:
+            parser.error("No REPORTS configured in looker_download.py")
+        success = export_reports(REPORTS, args.workers, sundays, args.retries, args.skip_existing)
+    elif sundays:
+        success = backfill_weeks(sundays, args.retries, args.skip_existing)
+    else:
+        success = download_looker_data()
     
     if success:
         print("\n✓ Download successfully completed!")
@@ -0,0 +1,220 @@
+"""
+Columnar master store for the consolidated weekly data
+One Parquet file per week, partitioned by Year/Week:
+
+    master_store/Year=2025/Week=45/part-0.parquet
+
+Year and Week live in the directory names (Hive style), so the store can
+also be opened directly with pd.read_parquet(store_folder)
+"""
+
+import os
+import glob
+import shutil
+import hashlib
+import logging
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from openpyxl import Workbook
+
+PARTITION_FILE = "part-0.parquet"
+
+# Rows of one Excel sheet (including the header row)
+EXCEL_MAX_ROWS = 1048576
+
+def file_hash(path, block_size=1024 * 1024):
+    """Calculate SHA-256 hash of a file (read in blocks)"""
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            sha256.update(block)
+    return sha256.hexdigest()
+
+def partition_dir(store_folder, year, week):
+    """Directory of one week partition"""
+    return os.path.join(store_folder, f"Year={year}", f"Week={week}")
+
+def list_partitions(store_folder):
+    """List all (year, week) partitions in the store, oldest first"""
+    partitions = []
+    for path in glob.glob(os.path.join(store_folder, "Year=*", "Week=*", PARTITION_FILE)):
+        week_dir = os.path.dirname(path)
+        year_dir = os.path.dirname(week_dir)
+        try:
+            year = int(os.path.basename(year_dir).split('=')[1])
+            week = int(os.path.basename(week_dir).split('=')[1])
+        except (IndexError, ValueError):
+            logging.warning(f"Ignoring unexpected partition folder: {week_dir}")
+            continue
+        partitions.append((year, week))
+    
+    return sorted(partitions)
+
+def write_week_partition(store_folder, year, week, df):
+    """Write (or replace) the partition of one week"""
+    target_dir = partition_dir(store_folder, year, week)
+    os.makedirs(target_dir, exist_ok=True)
+    
+    # Year/Week are encoded in the folder names, not stored in the file
+    df = df.drop(columns=['Year', 'Week'], errors='ignore')
+    
+    # Write to a temp file first so readers never see a half-written week
+    target_file = os.path.join(target_dir, PARTITION_FILE)
+    tmp_file = target_file + ".tmp"
+    df.to_parquet(tmp_file, index=False, engine='pyarrow')
+    os.replace(tmp_file, target_file)
+    
+    return target_file
+
+def write_week_partition_chunks(store_folder, year, week, chunks):
+    """
+    Write (or replace) the partition of one week from an iterator of DataFrame chunks
+    Only one chunk is in memory at a time; returns the number of rows written
+    """
+    target_dir = partition_dir(store_folder, year, week)
+    os.makedirs(target_dir, exist_ok=True)
+    
+    target_file = os.path.join(target_dir, PARTITION_FILE)
+    tmp_file = target_file + ".tmp"
+    
+    writer = None
+    rows = 0
+    try:
+        for chunk in chunks:
+            chunk = chunk.drop(columns=['Year', 'Week'], errors='ignore')
+            
+            if writer is None:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                # A column that is empty in the first chunk has no type yet: store it as text
+                schema = pa.schema([pa.field(field.name, pa.string()) if pa.types.is_null(field.type) else field
+                                    for field in table.schema], metadata=table.schema.metadata)
+                writer = pq.ParquetWriter(tmp_file, schema)
+            
+            # Later chunks must match the schema of the first chunk
+            writer.write_table(pa.Table.from_pandas(chunk, schema=writer.schema, preserve_index=False))
+            rows += len(chunk)
+    except Exception:
+        if writer is not None:
+            writer.close()
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
+    
+    if writer is None:
+        raise ValueError(f"No data chunks for Year={year}/Week={week}")
+    
+    writer.close()
+    os.replace(tmp_file, target_file)
+    
+    return rows
+
+def delete_week_partition(store_folder, year, week):
+    """Remove the partition of one week (no error if it does not exist)"""
+    target_dir = partition_dir(store_folder, year, week)
+    if os.path.isdir(target_dir):
+        shutil.rmtree(target_dir)
+        logging.info(f"Partition removed: Year={year}/Week={week}")
+        
+        # Clean up the year folder when its last week is gone
+        year_dir = os.path.dirname(target_dir)
+        if not os.listdir(year_dir):
+            os.rmdir(year_dir)
+
+def read_week_partition(store_folder, year, week, columns=None):
+    """
+    Read one week partition, with Year and Week columns in front
+    With columns, only those columns are read from the file (missing ones are empty)
+    """
+    path = os.path.join(partition_dir(store_folder, year, week), PARTITION_FILE)
+    
+    if columns is None:
+        df = pd.read_parquet(path, engine='pyarrow')
+    else:
+        # Columns can differ per week: only ask the file for the ones it has
+        available = set(pq.read_schema(path).names)
+        wanted = [column for column in columns if column not in ('Year', 'Week')]
+        df = pd.read_parquet(path, engine='pyarrow', columns=[c for c in wanted if c in available])
+        df = df.reindex(columns=wanted)
+    
+    df.insert(0, 'Year', year)
+    df.insert(1, 'Week', week)
+    return df
+
+def read_store(store_folder, start=None, end=None, columns=None):
+    """
+    Read the store into one DataFrame (oldest week first)
+    start/end: (year, week) tuples, inclusive - other partitions are not opened
+    columns: only read these columns (Year and Week are always included)
+    """
+    partitions = [(year, week) for year, week in list_partitions(store_folder)
+                  if (start is None or (year, week) >= tuple(start))
+                  and (end is None or (year, week) <= tuple(end))]
+    
+    frames = [read_week_partition(store_folder, year, week, columns)
+              for year, week in partitions]
+    
+    if not frames:
+        empty_columns = ['Year', 'Week'] + [c for c in (columns or []) if c not in ('Year', 'Week')]
+        return pd.DataFrame(columns=empty_columns)
+    
+    return pd.concat(frames, ignore_index=True)
+
+def store_row_count(store_folder):
+    """Count rows in the store from the Parquet footers (without reading data)"""
+    total = 0
+    for year, week in list_partitions(store_folder):
+        path = os.path.join(partition_dir(store_folder, year, week), PARTITION_FILE)
+        total += pq.ParquetFile(path).metadata.num_rows
+    return total
+
+def store_columns(store_folder):
+    """All columns in the store (Year, Week first), read from the Parquet footers"""
+    columns = ['Year', 'Week']
+    for year, week in list_partitions(store_folder):
+        path = os.path.join(partition_dir(store_folder, year, week), PARTITION_FILE)
+        for name in pq.read_schema(path).names:
+            if name not in columns:
+                columns.append(name)
+    return columns
+
+def export_excel(store_folder, excel_file, batch_size=50000):
+    """
+    Export the complete store to one Excel file
+    Streams the store batch by batch (openpyxl write-only mode), so the
+    whole history is never in memory at once; returns the number of rows
+    Raises ValueError if the store has more rows than one sheet holds
+    """
+    total_rows = store_row_count(store_folder)
+    if total_rows >= EXCEL_MAX_ROWS:
+        raise ValueError(f"{total_rows} rows do not fit in one Excel sheet (max {EXCEL_MAX_ROWS - 1})")
+    
+    columns = store_columns(store_folder)
+    
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Sheet1')
+    sheet.append(columns)
+    
+    rows = 0
+    for year, week in list_partitions(store_folder):
+        path = os.path.join(partition_dir(store_folder, year, week), PARTITION_FILE)
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size):
+            df = batch.to_pandas()
+            df.insert(0, 'Year', year)
+            df.insert(1, 'Week', week)
+            
+            # Same column order for every week, empty cells instead of NaN
+            df = df.reindex(columns=columns).astype(object)
+            df = df.where(df.notna(), None)
+            
+            for row in df.itertuples(index=False, name=None):
+                sheet.append(row)
+            rows += len(df)
+    
+    # Save to a temp file first: the master is replaced, never rewritten in place
+    tmp_file = excel_file + ".tmp"
+    workbook.save(tmp_file)
+    os.replace(tmp_file, excel_file)
+    
+    return rows
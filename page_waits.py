@@ -0,0 +1,191 @@
+"""
+Condition-based waits for the Looker Studio page
+Each phase of the download waits for something concrete (calendars open,
+table re-rendered, menu item visible, ...) with a deadline, instead of a
+fixed time.sleep: it continues as soon as the page is ready
+
+    calendars = wait_until(visible(driver, By.CSS_SELECTOR, ".mat-calendar-content"),
+                           10, "date picker calendars")
+"""
+
+import time
+import logging
+
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException, TimeoutException
+
+# How often a condition is checked (seconds)
+POLL_INTERVAL = 0.1
+
+# Login pages Looker Studio redirects to when the session is gone
+LOGIN_URL_MARKERS = ("accounts.google.com", "signin")
+
+TABLE_XPATH = "//ng2-canvas-component[contains(@class, 'simple-table')]"
+TABLE_CSS = "ng2-canvas-component.simple-table"
+LOADER_CSS = "[class*='loading'], [class*='spinner'], [class*='progress']"
+HEADER_XPATH = "//ng2-component-header[contains(@class, 'simple-table')]"
+HEADER_BUTTON_XPATH = HEADER_XPATH + "//button"
+# The chart header's more-options (3-dot) button: words in its aria-label/icon/class,
+# and its distance (px) from the header's right edge while it is still hidden
+MORE_OPTIONS_MARKERS = ("more", "option", "menu")
+MENU_BUTTON_INSET = 20
+CALENDAR_XPATH = "//div[contains(@class, 'mat-calendar-content')]"
+MENU_XPATH = "//*[@role='menu' or contains(@class, 'mat-menu-panel')]"
+DIALOG_XPATH = "//mat-dialog-container | //*[@role='dialog']"
+
+def wait_until(condition, timeout, description, poll=POLL_INTERVAL, required=True):
+    """
+    Call condition() until it returns something truthy (which is returned)
+    On the deadline: raise TimeoutException, or return None if not required
+    """
+    start = time.monotonic()
+    deadline = start + timeout
+    
+    while True:
+        try:
+            result = condition()
+        except (NoSuchElementException, StaleElementReferenceException):
+            result = None  # Page is still changing
+        
+        if result:
+            logging.info(f"  Waited {time.monotonic() - start:.1f}s for {description}")
+            return result
+        
+        if time.monotonic() >= deadline:
+            if required:
+                raise TimeoutException(f"Timed out after {timeout}s waiting for {description}")
+            logging.info(f"  {description}: not seen within {timeout}s, continuing")
+            return None
+        
+        time.sleep(poll)
+
+def is_login_page(driver):
+    """True if the browser was redirected to the Google login"""
+    url = driver.current_url.lower()
+    return any(marker in url for marker in LOGIN_URL_MARKERS)
+
+def document_ready(driver):
+    """Condition: the page has finished loading"""
+    return lambda: driver.execute_script("return document.readyState") == "complete"
+
+def dashboard_or_login(driver):
+    """Condition: returns 'login' on the login page, 'dashboard' once the table component exists"""
+    def check():
+        if is_login_page(driver):
+            return 'login'
+        if driver.find_elements(By.XPATH, TABLE_XPATH):
+            return 'dashboard'
+        return None
+    return check
+
+def logged_in(driver):
+    """Condition: the browser left the login page and the dashboard exists"""
+    return lambda: not is_login_page(driver) and bool(driver.find_elements(By.XPATH, TABLE_XPATH))
+
+def visible(driver, by, value, within=None):
+    """Condition: returns the first visible element matching the locator"""
+    def check():
+        for element in (within or driver).find_elements(by, value):
+            if element.is_displayed():
+                return element
+        return None
+    return check
+
+def any_visible(driver, locators, within=None):
+    """Condition: returns the first visible element of the first locator that matches"""
+    conditions = [visible(driver, by, value, within) for by, value in locators]
+    def check():
+        for condition in conditions:
+            element = condition()
+            if element:
+                return element
+        return None
+    return check
+
+def gone(driver, by, value, within=None):
+    """Condition: no element matching the locator is visible (anymore)"""
+    find = visible(driver, by, value, within)
+    return lambda: find() is None
+
+def in_viewport(driver, element):
+    """Condition: (part of) the element is scrolled into the viewport"""
+    return lambda: driver.execute_script("""
+        var rect = arguments[0].getBoundingClientRect();
+        return rect.height > 0 && rect.bottom > 0 && rect.top < window.innerHeight;
+    """, element)
+
+# Resolves once the table subtree had no DOM mutations for quietMs (and shows no
+# loading indicator), or with settled=false after timeoutMs
+TABLE_RENDER_SCRIPT = """
+var selector = arguments[0], loaderCss = arguments[1];
+var quietMs = arguments[2], firstQuietMs = arguments[3], timeoutMs = arguments[4];
+var done = arguments[arguments.length - 1];
+
+var start = performance.now();
+var table = null, observer = null, quietTimer = null, pollTimer = null, mutations = 0, finished = false;
+
+function finish(settled) {
+    if (finished) { return; }
+    finished = true;
+    if (observer) { observer.disconnect(); }
+    clearTimeout(quietTimer);
+    clearTimeout(deadline);
+    clearInterval(pollTimer);
+    done({settled: settled, mutations: mutations, ms: Math.round(performance.now() - start)});
+}
+
+function armQuiet(ms) {
+    clearTimeout(quietTimer);
+    quietTimer = setTimeout(function () {
+        // Looker may replace the whole component: follow the new one
+        if (!table.isConnected) {
+            if (!attach()) { waitForTable(); }
+            return;
+        }
+        if (table.querySelector(loaderCss)) { armQuiet(quietMs); return; }
+        finish(true);
+    }, ms);
+}
+
+function attach() {
+    table = document.querySelector(selector);
+    if (!table) { return false; }
+    if (observer) { observer.disconnect(); }
+    observer = new MutationObserver(function (records) {
+        mutations += records.length;
+        armQuiet(quietMs);
+    });
+    observer.observe(table, {childList: true, subtree: true, characterData: true, attributes: true});
+    armQuiet(mutations ? quietMs : firstQuietMs);
+    return true;
+}
+
+function waitForTable() {
+    pollTimer = setInterval(function () {
+        if (attach()) { clearInterval(pollTimer); }
+    }, 50);
+}
+
+var deadline = setTimeout(function () { finish(false); }, timeoutMs);
+if (!attach()) { waitForTable(); }
+"""
+
+def wait_for_table_render(driver, quiet_seconds=1.0, timeout=30, first_quiet_seconds=None):
+    """
+    Block until the table has been quiet (no DOM mutations) for `quiet_seconds`
+    The detector runs in the page (MutationObserver), so this is one call, not polling
+    first_quiet_seconds: quiet window before the first mutation, e.g. to give a
+    reload that was just triggered time to start
+    Returns True if the table settled within the timeout
+    """
+    first_quiet_seconds = quiet_seconds if first_quiet_seconds is None else first_quiet_seconds
+    driver.set_script_timeout(timeout + 5)
+    
+    result = driver.execute_async_script(TABLE_RENDER_SCRIPT, TABLE_CSS, LOADER_CSS, int(quiet_seconds * 1000),
+                                         int(first_quiet_seconds * 1000), int(timeout * 1000))
+    
+    if result['settled']:
+        logging.info(f"  Table settled after {result['ms'] / 1000:.1f}s ({result['mutations']} DOM mutations)")
+    else:
+        logging.info(f"  Table still changing after {timeout}s ({result['mutations']} DOM mutations), continuing")
+    return result['settled']
@@ -0,0 +1,223 @@
+"""
+Per-phase timings of a download/consolidation run, written as structured metrics
+Phases are timed with spans; a phase that runs several times in one run (e.g.
+date selection in a backfill) adds up:
+
+    with phase_metrics.span('date_selection'):
+        ...
+
+    @phase_metrics.timed('download_wait')
+    def wait_for_download(...): ...
+
+When a run finishes, one JSON line is appended to phase_metrics.jsonl in the
+run's folder and phase_metrics.prom (Prometheus textfile) is rewritten with the
+p50/p95 of every phase over the last HISTORY_RUNS runs:
+
+    python phase_metrics.py C:\\path\\to\\output\\folder    # p50/p95 table
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+from functools import wraps
+from contextlib import contextmanager
+from datetime import datetime
+
+# ============================================
+# CONFIGURATION
+# ============================================
+METRICS_FILE = "phase_metrics.jsonl"
+PROMETHEUS_FILE = "phase_metrics.prom"
+
+# Folder of the node_exporter textfile collector (None = write next to the JSONL file)
+PROMETHEUS_TEXTFILE_DIR = None
+
+# Runs the percentiles are computed over
+HISTORY_RUNS = 100
+# ============================================
+
+# The run being timed in this process: {'kind', 'folder', 'started', 'phases': {phase: seconds}}
+_run = None
+
+def start_run(kind, folder):
+    """Start timing a run; returns False if a run is already being timed (spans then go there)"""
+    global _run
+    if _run is not None:
+        return False
+    _run = {'kind': kind, 'folder': folder, 'started': time.time(), 'phases': {}}
+    return True
+
+@contextmanager
+def span(phase):
+    """Time the block as (part of) a phase of the current run (not recorded outside a run)"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if _run is not None:
+            _run['phases'][phase] = _run['phases'].get(phase, 0.0) + time.perf_counter() - start
+
+def timed(phase):
+    """Decorator: the function call is (part of) a phase"""
+    def decorate(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            with span(phase):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def timed_run(kind, folder):
+    """
+    Decorator: the function call is a run of its own (unless it runs inside one)
+    folder: function returning the folder for the metrics files; success = truthy result
+    """
+    def decorate(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            own_run = start_run(kind, folder())
+            success = False
+            try:
+                success = function(*args, **kwargs)
+                return success
+            finally:
+                if own_run:
+                    finish_run(bool(success))
+        return wrapper
+    return decorate
+
+def finish_run(success):
+    """Write the current run to the JSONL and Prometheus files (failures are logged, not raised)"""
+    global _run
+    run, _run = _run, None
+    if run is None:
+        return
+    
+    record = {
+        'time': datetime.fromtimestamp(run['started']).isoformat(timespec='seconds'),
+        'kind': run['kind'],
+        'success': success,
+        'seconds': round(time.time() - run['started'], 3),
+        'phases': {phase: round(seconds, 3) for phase, seconds in run['phases'].items()},
+    }
+    phases = ", ".join(f"{phase} {seconds:.1f}s" for phase, seconds in record['phases'].items())
+    logging.info(f"Run took {record['seconds']:.1f}s" + (f" - phases: {phases}" if phases else ""))
+    
+    try:
+        os.makedirs(run['folder'], exist_ok=True)
+        metrics_file = os.path.join(run['folder'], METRICS_FILE)
+        with open(metrics_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + "\n")
+        write_prometheus(load_runs(run['folder']), prometheus_path(run['folder']), report_name(run['folder']))
+    except Exception as e:
+        logging.warning(f"Could not write phase metrics: {e}")
+
+def load_runs(folder, last=HISTORY_RUNS):
+    """The last `last` runs recorded in a folder (oldest first)"""
+    metrics_file = os.path.join(folder, METRICS_FILE)
+    if not os.path.exists(metrics_file):
+        return []
+    with open(metrics_file, 'r', encoding='utf-8') as f:
+        runs = [json.loads(line) for line in f if line.strip()]
+    return runs[-last:]
+
+def percentile(values, q):
+    """q-th percentile (0-100) with linear interpolation"""
+    values = sorted(values)
+    position = (len(values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+def phase_stats(runs):
+    """{(kind, phase): {'p50', 'p95', 'sum', 'count'}} over the successful runs"""
+    durations = {}
+    for run in runs:
+        if not run['success']:
+            continue
+        for phase, seconds in list(run['phases'].items()) + [('total', run['seconds'])]:
+            durations.setdefault((run['kind'], phase), []).append(seconds)
+    
+    return {key: {'p50': percentile(values, 50), 'p95': percentile(values, 95),
+                  'sum': sum(values), 'count': len(values)}
+            for key, values in durations.items()}
+
+def report_name(folder):
+    """Name of a report in the metrics: the name of its output folder"""
+    return os.path.basename(os.path.normpath(folder)) or "looker"
+
+def prometheus_path(folder):
+    """Where the textfile goes (one file per output folder in the collector directory)"""
+    if not PROMETHEUS_TEXTFILE_DIR:
+        return os.path.join(folder, PROMETHEUS_FILE)
+    return os.path.join(PROMETHEUS_TEXTFILE_DIR, f"looker_{report_name(folder)}.prom")
+
+def write_prometheus(runs, path, report):
+    """
+    Rewrite the textfile: p50/p95 summaries per phase and the phases of the last run of each kind
+    Every series has a report label, so the files of several reports can be collected together
+    """
+    lines = [
+        "# HELP looker_phase_seconds Duration of a run phase over the last successful runs",
+        "# TYPE looker_phase_seconds summary",
+    ]
+    for (kind, phase), stats in sorted(phase_stats(runs).items()):
+        labels = f'report="{report}",kind="{kind}",phase="{phase}"'
+        lines.append(f'looker_phase_seconds{{{labels},quantile="0.5"}} {stats["p50"]:.3f}')
+        lines.append(f'looker_phase_seconds{{{labels},quantile="0.95"}} {stats["p95"]:.3f}')
+        lines.append(f'looker_phase_seconds_sum{{{labels}}} {stats["sum"]:.3f}')
+        lines.append(f'looker_phase_seconds_count{{{labels}}} {stats["count"]}')
+    
+    last_runs = sorted({run['kind']: run for run in runs}.items())
+    lines += [
+        "# HELP looker_last_run_phase_seconds Duration of each phase in the last run",
+        "# TYPE looker_last_run_phase_seconds gauge",
+    ]
+    for kind, run in last_runs:
+        for phase, seconds in list(run['phases'].items()) + [('total', run['seconds'])]:
+            lines.append(f'looker_last_run_phase_seconds{{report="{report}",kind="{kind}",phase="{phase}"}} '
+                         f'{seconds:.3f}')
+    lines += [
+        "# HELP looker_last_run_success 1 if the last run succeeded",
+        "# TYPE looker_last_run_success gauge",
+    ]
+    for kind, run in last_runs:
+        lines.append(f'looker_last_run_success{{report="{report}",kind="{kind}"}} {int(run["success"])}')
+    lines += [
+        "# HELP looker_last_run_timestamp_seconds Start of the last run (Unix time)",
+        "# TYPE looker_last_run_timestamp_seconds gauge",
+    ]
+    for kind, run in last_runs:
+        started = datetime.fromisoformat(run['time']).timestamp()
+        lines.append(f'looker_last_run_timestamp_seconds{{report="{report}",kind="{kind}"}} {started:.0f}')
+    
+    # Via temp file: the collector must never read a half-written file
+    tmp_file = path + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(tmp_file, path)
+
+def print_stats(folder, last=HISTORY_RUNS):
+    """Print p50/p95 per phase of the runs recorded in a folder"""
+    runs = load_runs(folder, last)
+    if not runs:
+        print(f"No runs recorded in {os.path.join(folder, METRICS_FILE)}")
+        return
+    
+    failed = sum(not run['success'] for run in runs)
+    print(f"{len(runs)} runs ({failed} failed, not included), {runs[0]['time']} - {runs[-1]['time']}\n")
+    print(f"{'kind':<14} {'phase':<24} {'runs':>5} {'p50 s':>8} {'p95 s':>8}")
+    # Slowest phases first, per kind
+    for (kind, phase), stats in sorted(phase_stats(runs).items(), key=lambda item: (item[0][0], -item[1]['p50'])):
+        print(f"{kind:<14} {phase:<24} {stats['count']:>5} {stats['p50']:>8.1f} {stats['p95']:>8.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="p50/p95 per phase of the recorded runs")
+    parser.add_argument('folder', help="Folder with phase_metrics.jsonl (the output folder)")
+    parser.add_argument('--last', type=int, default=HISTORY_RUNS, help="Number of most recent runs")
+    args = parser.parse_args()
+    print_stats(args.folder, args.last)
+    sys.exit(0)
@@ -0,0 +1,60 @@
+"""
+Query the consolidated weekly data without opening the whole master
+Reads only the requested weeks and columns from the master store
+
+Examples:
+    python query_master.py --start 2025-40 --end 2025-52
+    python query_master.py --start 2025-40 --columns Campaign Clicks --output weeks_40_52.xlsx
+    python query_master.py --rollup quarter
+"""
+
+import sys
+import argparse
+
+import pandas as pd
+
+from consolidate_weekly_data import load_weeks, load_rollup
+
+def parse_week(value):
+    """Parse 'YYYY-WW' (e.g. 2025-45) into a (year, week) tuple"""
+    try:
+        year, week = value.split('-')
+        return int(year), int(week)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Expected YYYY-WW (e.g. 2025-45), got: {value}")
+
+def export_result(df, output_file):
+    """Write the result to CSV, Excel or Parquet (based on the extension)"""
+    if output_file.endswith('.xlsx'):
+        df.to_excel(output_file, index=False, engine='openpyxl')
+    elif output_file.endswith('.parquet'):
+        df.to_parquet(output_file, index=False, engine='pyarrow')
+    else:
+        df.to_csv(output_file, index=False)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query weeks and columns from the master store")
+    parser.add_argument('--start', type=parse_week, help="First week (YYYY-WW), inclusive")
+    parser.add_argument('--end', type=parse_week, help="Last week (YYYY-WW), inclusive")
+    parser.add_argument('--columns', nargs='+', help="Columns to read (Year and Week are always included)")
+    parser.add_argument('--rollup', choices=['week', 'month', 'quarter'],
+                        help="Show a rollup table instead of weekly rows")
+    parser.add_argument('--output', help="Export to a file (.csv, .xlsx or .parquet) instead of printing")
+    args = parser.parse_args()
+    
+    try:
+        if args.rollup:
+            df = load_rollup(args.rollup)
+        else:
+            df = load_weeks(start=args.start, end=args.end, columns=args.columns)
+    except Exception as e:
+        print(f"✗ Query failed: {e}")
+        sys.exit(1)
+    
+    if args.output:
+        export_result(df, args.output)
+        print(f"✓ {len(df)} rows written to: {args.output}")
+    else:
+        with pd.option_context('display.max_rows', 200, 'display.width', 200):
+            print(df)
+        print(f"\n{len(df)} rows")
@@ -0,0 +1,148 @@
+"""
+Materialized monthly and quarterly rollups of the master store
+
+    rollups/weekly_totals.parquet   one row per week (and dimension values)
+    rollups/monthly.parquet         keyed by Year/Month
+    rollups/quarterly.parquet       keyed by Year/Quarter
+
+When weeks change, only their weekly totals are recomputed from the store,
+and only the months/quarters those weeks fall in are rebuilt (from the
+small weekly totals table, not from the row-level data)
+
+A week (Sunday to Saturday) belongs to the month/quarter of its Wednesday
+"""
+
+import os
+import logging
+from datetime import timedelta
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+import master_store
+import week_naming
+
+# Kinds from the typed ingest schema that can be summed
+ADDITIVE_KINDS = ('number', 'currency')
+
+PERIODS = {
+    'month': ('Month', "monthly.parquet"),
+    'quarter': ('Quarter', "quarterly.parquet"),
+}
+
+def week_midpoint(year, week):
+    """Wednesday of the week named (week, year) in the weekly file names"""
+    return week_naming.week_sunday(week, year) + timedelta(days=3)
+
+def week_periods(year, week):
+    """(year, month) and (year, quarter) a week belongs to"""
+    midpoint = week_midpoint(year, week)
+    return (midpoint.year, midpoint.month), (midpoint.year, (midpoint.month - 1) // 3 + 1)
+
+def additive_columns(store_folder, schema=None):
+    """
+    Columns to sum: number/currency columns of the typed schema, or
+    (without a schema) all numeric columns found in the store
+    """
+    if schema:
+        return [column for column, kind in schema.items() if kind in ADDITIVE_KINDS]
+    
+    columns = []
+    for year, week in master_store.list_partitions(store_folder):
+        path = os.path.join(master_store.partition_dir(store_folder, year, week), master_store.PARTITION_FILE)
+        for field in pq.read_schema(path):
+            if field.name not in columns and pd.api.types.is_numeric_dtype(field.type.to_pandas_dtype()):
+                columns.append(field.name)
+    return columns
+
+def write_table(df, path):
+    """Write a rollup table (via temp file)"""
+    tmp_file = path + ".tmp"
+    df.to_parquet(tmp_file, index=False, engine='pyarrow')
+    os.replace(tmp_file, path)
+
+def week_totals(store_folder, year, week, measures, dimensions):
+    """Sum the measures of one week (per dimension values), plus a row count"""
+    df = master_store.read_week_partition(store_folder, year, week, columns=list(dimensions) + measures)
+    df['Rows'] = 1
+    
+    keys = ['Year', 'Week'] + list(dimensions)
+    totals = df.groupby(keys, dropna=False, as_index=False)[measures + ['Rows']].sum(min_count=1)
+    
+    (month_year, month), (_, quarter) = week_periods(year, week)
+    totals.insert(2, 'PeriodYear', month_year)
+    totals.insert(3, 'Month', month)
+    totals.insert(4, 'Quarter', quarter)
+    return totals
+
+def load_rollup(rollup_folder, period='month'):
+    """Read a rollup table ('week', 'month' or 'quarter') without touching the row-level data"""
+    filename = "weekly_totals.parquet" if period == 'week' else PERIODS[period][1]
+    path = os.path.join(rollup_folder, filename)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No {period} rollup yet: {path}")
+    return pd.read_parquet(path, engine='pyarrow')
+
+def update_rollups(store_folder, rollup_folder, weeks=None, measures=None, dimensions=(), schema=None):
+    """
+    Update the rollups for changed (or removed) weeks
+    weeks=None, a missing rollup or changed measures/dimensions rebuild everything
+    """
+    os.makedirs(rollup_folder, exist_ok=True)
+    totals_file = os.path.join(rollup_folder, "weekly_totals.parquet")
+    
+    if measures is None:
+        measures = additive_columns(store_folder, schema)
+    dimensions = list(dimensions)
+    expected_columns = ['Year', 'Week', 'PeriodYear', 'Month', 'Quarter'] + dimensions + measures + ['Rows']
+    
+    totals = None
+    if weeks is not None and os.path.exists(totals_file):
+        totals = pd.read_parquet(totals_file, engine='pyarrow')
+        if list(totals.columns) != expected_columns:
+            logging.info("Rollup measures/dimensions changed, rebuilding all rollups")
+            totals = None
+    
+    stored_weeks = set(master_store.list_partitions(store_folder))
+    if totals is None:
+        weeks = sorted(stored_weeks)
+        totals = pd.DataFrame(columns=expected_columns)
+        rebuild = True
+    else:
+        weeks = sorted(set(weeks))
+        rebuild = False
+    
+    # Replace the weekly totals of the changed weeks
+    changed = pd.MultiIndex.from_frame(totals[['Year', 'Week']].astype('int64')).isin(weeks)
+    frames = [totals[~changed]]
+    frames += [week_totals(store_folder, year, week, measures, dimensions)
+               for year, week in weeks if (year, week) in stored_weeks]
+    frames = [frame for frame in frames if not frame.empty]
+    totals = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=expected_columns)
+    totals = totals.sort_values(['Year', 'Week'], kind='stable').reset_index(drop=True)
+    write_table(totals, totals_file)
+    
+    # Only the periods the changed weeks belong to are recomputed
+    for period, (period_column, filename) in PERIODS.items():
+        path = os.path.join(rollup_folder, filename)
+        keys = ['Year', period_column] + dimensions
+        
+        affected = sorted({week_periods(year, week)[0 if period == 'month' else 1] for year, week in weeks})
+        
+        rollup = None
+        if not rebuild and os.path.exists(path):
+            rollup = pd.read_parquet(path, engine='pyarrow')
+            rollup = rollup[~pd.MultiIndex.from_frame(rollup[['Year', period_column]].astype('int64')).isin(affected)]
+        
+        source = totals.rename(columns={'Year': 'WeekYear', 'PeriodYear': 'Year'})
+        source = source[pd.MultiIndex.from_frame(source[['Year', period_column]].astype('int64')).isin(affected)]
+        recomputed = source.groupby(keys, dropna=False, as_index=False)[measures + ['Rows']].sum(min_count=1)
+        
+        frames = [frame for frame in (rollup, recomputed) if frame is not None and not frame.empty]
+        result = pd.concat(frames, ignore_index=True) if frames else recomputed
+        result = result.sort_values(keys, kind='stable').reset_index(drop=True)
+        write_table(result, path)
+        
+        logging.info(f"Rollup '{period}': {len(affected)} periods updated ({len(result)} rows)")
+    
+    return measures
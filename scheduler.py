@@ -0,0 +1,298 @@
+"""
+Built-in scheduler for recurring exports (cross-platform, no Task Scheduler/cron needed)
+Runs looker_download.py on cron-like schedules, e.g. one entry per report:
+
+    SCHEDULES = [
+        {'name': 'sea',     'cron': '0 7 * * 1',  'args': ['--report', 'sea', '--lean']},
+        {'name': 'display', 'cron': '30 7 * * 1', 'args': ['--report', 'display', '--lean']},
+    ]
+
+- at most MAX_CONCURRENT_JOBS downloads run at the same time
+- a trigger that fires while the same job is still running (or waiting for a
+  free slot) is coalesced into that run instead of starting a second one
+- slots missed while the scheduler was not running are caught up once at startup
+- the job state (last slot, last run, result) is kept in STATE_FILE
+
+    python scheduler.py           # run until stopped (Ctrl+C)
+    python scheduler.py --list    # show the jobs and their next runs
+"""
+
+import os
+import sys
+import json
+import signal
+import asyncio
+import logging
+import argparse
+from datetime import datetime, timedelta
+
+# ============================================
+# CONFIGURATION
+# ============================================
+# Cron fields: minute hour day-of-month month day-of-week (0 or 7 = Sunday)
+# Each field: *, a number, a range (1-5), a list (1,3,5) or a step (*/15, 0-30/10)
+# args: arguments for looker_download.py (e.g. --report NAME, --lean)
+SCHEDULES = [
+    {'name': 'weekly-download', 'cron': '0 9 * * 1', 'args': []},
+]
+
+# Downloads running at the same time (one Chrome each)
+MAX_CONCURRENT_JOBS = 2
+
+# A run taking longer than this (seconds) is stopped and counts as failed
+JOB_TIMEOUT = 3600
+
+# Run missed slots (one run per job) when the scheduler starts
+CATCH_UP = True
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+STATE_FILE = os.path.join(SCRIPT_DIR, "scheduler_state.json")
+LOG_FILE = os.path.join(SCRIPT_DIR, "scheduler_log.txt")
+# ============================================
+
+CRON_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+def parse_field(field, low, high):
+    """One cron field -> set of allowed values"""
+    values = set()
+    for part in field.split(','):
+        step = 1
+        if '/' in part:
+            part, step = part.split('/')
+            step = int(step)
+        if part == '*':
+            start, end = low, high
+        elif '-' in part:
+            start, end = (int(value) for value in part.split('-'))
+        else:
+            start = end = int(part)
+            if step > 1:
+                end = high
+        if not (low <= start <= end <= high) or step < 1:
+            raise ValueError(f"Cron field out of range ({low}-{high}): {field}")
+        values.update(range(start, end + 1, step))
+    return values
+
+def parse_cron(expression):
+    """'0 7 * * 1' -> (minutes, hours, days, months, weekdays, day_restricted, weekday_restricted)"""
+    fields = expression.split()
+    if len(fields) != 5:
+        raise ValueError(f"Cron expression needs 5 fields: {expression}")
+    
+    minutes, hours, days, months, weekdays = (parse_field(field, low, high)
+                                              for field, (low, high) in zip(fields, CRON_RANGES))
+    # Cron weekdays: 0 and 7 are Sunday -> Python weekday() numbering (Monday = 0)
+    weekdays = {(day - 1) % 7 for day in weekdays}
+    # As in cron, a field starting with '*' (also */2) does not restrict the day
+    return minutes, hours, days, months, weekdays, not fields[2].startswith('*'), not fields[4].startswith('*')
+
+def day_matches(cron, day):
+    """Day-of-month and day-of-week as cron combines them (either, if both are restricted)"""
+    _, _, days, months, weekdays, day_restricted, weekday_restricted = cron
+    if day.month not in months:
+        return False
+    if day_restricted and weekday_restricted:
+        return day.day in days or day.weekday() in weekdays
+    return day.day in days and day.weekday() in weekdays
+
+def next_run(cron, after):
+    """First time after `after` (exclusive) that matches the parsed cron expression"""
+    minutes, hours = cron[0], cron[1]
+    current = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+    limit = current + timedelta(days=366 * 5)
+    
+    while current < limit:
+        if not day_matches(cron, current):
+            current = (current + timedelta(days=1)).replace(hour=0, minute=0)
+        elif current.hour not in hours:
+            current = (current + timedelta(hours=1)).replace(minute=0)
+        elif current.minute not in minutes:
+            current += timedelta(minutes=1)
+        else:
+            return current
+    raise ValueError("Cron expression never matches")
+
+def load_state(state_file=STATE_FILE):
+    """Job state from disk ({name: {...}}), empty if there is none yet"""
+    if not os.path.exists(state_file):
+        return {}
+    try:
+        with open(state_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        logging.warning(f"Could not read scheduler state, starting empty: {e}")
+        return {}
+
+def save_state(state, state_file=STATE_FILE):
+    """Write the job state (via temp file)"""
+    tmp_file = state_file + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp_file, state_file)
+
+async def sleep_until(moment):
+    """Sleep until a wall-clock time (in short steps, so clock changes and suspend are noticed)"""
+    while True:
+        remaining = (moment - datetime.now()).total_seconds()
+        if remaining <= 0:
+            return
+        await asyncio.sleep(min(remaining, 60))
+
+async def kill_process_tree(process):
+    """Kill a job with everything it started (chromedriver and Chrome would keep the profile locked)"""
+    if sys.platform.startswith('win'):
+        killer = await asyncio.create_subprocess_exec('taskkill', '/F', '/T', '/PID', str(process.pid),
+                                                      stdout=asyncio.subprocess.DEVNULL,
+                                                      stderr=asyncio.subprocess.DEVNULL)
+        await killer.wait()
+    else:
+        # The job runs in its own session: its process group holds the whole tree
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+    
+    try:
+        process.kill()
+    except ProcessLookupError:
+        pass
+    await process.wait()
+
+class Scheduler:
+    """Triggers the jobs, limits concurrency, coalesces overlaps and keeps the state"""
+
+    def __init__(self, schedules, max_concurrent=MAX_CONCURRENT_JOBS, state_file=STATE_FILE):
+        self.jobs = {job['name']: dict(job, parsed=parse_cron(job['cron'])) for job in schedules}
+        self.state_file = state_file
+        self.state = load_state(state_file)
+        self.max_concurrent = max_concurrent
+        self.slots = asyncio.Semaphore(max_concurrent)
+        self.active = {}  # name -> task of the run that is waiting or running
+
+    def job_state(self, name):
+        """State entry of a job (created on first use)"""
+        return self.state.setdefault(name, {'runs': 0, 'failures': 0, 'coalesced': 0})
+
+    def trigger(self, name, slot, reason):
+        """Start a run for the slot, or merge it into the run that is still active"""
+        entry = self.job_state(name)
+        entry['last_slot'] = slot.isoformat(timespec='minutes')
+        
+        if name in self.active:
+            entry['coalesced'] += 1
+            logging.info(f"[{name}] {reason} {slot:%Y-%m-%d %H:%M} coalesced into the active run")
+        else:
+            logging.info(f"[{name}] {reason} {slot:%Y-%m-%d %H:%M}")
+            self.active[name] = asyncio.create_task(self.run_job(name))
+        save_state(self.state, self.state_file)
+
+    async def run_job(self, name):
+        """Run looker_download.py for the job (once a slot is free)"""
+        job = self.jobs[name]
+        entry = self.job_state(name)
+        try:
+            async with self.slots:
+                command = [sys.executable, os.path.join(SCRIPT_DIR, "looker_download.py")] + job.get('args', [])
+                started = datetime.now()
+                entry['last_started'] = started.isoformat(timespec='seconds')
+                save_state(self.state, self.state_file)
+                logging.info(f"[{name}] Starting: {' '.join(command[1:])}")
+                
+                process = await asyncio.create_subprocess_exec(*command, cwd=SCRIPT_DIR,
+                                                               stdout=asyncio.subprocess.DEVNULL,
+                                                               stderr=asyncio.subprocess.DEVNULL,
+                                                               start_new_session=not sys.platform.startswith('win'))
+                try:
+                    returncode = await asyncio.wait_for(process.wait(), JOB_TIMEOUT)
+                except asyncio.TimeoutError:
+                    await kill_process_tree(process)
+                    returncode = None
+                    logging.error(f"[{name}] Stopped after {JOB_TIMEOUT}s")
+            
+            seconds = (datetime.now() - started).total_seconds()
+            success = returncode == 0
+            entry['runs'] += 1
+            entry['failures'] += not success
+            entry['last_finished'] = datetime.now().isoformat(timespec='seconds')
+            entry['last_status'] = 'ok' if success else ('timeout' if returncode is None else f"exit {returncode}")
+            entry['last_seconds'] = round(seconds, 1)
+            logging.info(f"[{name}] {'✓' if success else '✗'} {entry['last_status']} after {seconds:.0f}s")
+        
+        except Exception as e:
+            entry['last_status'] = f"error: {e}"
+            logging.error(f"[{name}] Could not run job: {e}", exc_info=True)
+        
+        finally:
+            self.active.pop(name, None)
+            save_state(self.state, self.state_file)
+
+    def catch_up(self, now):
+        """Run each job once whose slot passed while the scheduler was not running"""
+        for name, job in self.jobs.items():
+            last_slot = self.job_state(name).get('last_slot')
+            if not last_slot:
+                continue
+            missed = next_run(job['parsed'], datetime.fromisoformat(last_slot))
+            if missed > now:
+                continue
+            
+            # One run for all missed slots, recorded as the latest one (a restart
+            # before the next regular slot must not catch up again)
+            latest, count = missed, 1
+            while (following := next_run(job['parsed'], latest)) <= now:
+                latest, count = following, count + 1
+            self.trigger(name, latest, f"Catching up {count} missed slot(s), latest")
+
+    async def job_loop(self, name):
+        """Trigger one job at each of its slots"""
+        cron = self.jobs[name]['parsed']
+        while True:
+            slot = next_run(cron, datetime.now())
+            await sleep_until(slot)
+            self.trigger(name, slot, "Slot")
+
+    async def run(self, catch_up=CATCH_UP):
+        """Run until cancelled"""
+        logging.info(f"=== Scheduler started: {len(self.jobs)} jobs, max {self.max_concurrent} at a time ===")
+        for name, job in self.jobs.items():
+            logging.info(f"  {name}: '{job['cron']}', next run {next_run(job['parsed'], datetime.now()):%Y-%m-%d %H:%M}")
+        
+        if catch_up:
+            self.catch_up(datetime.now())
+        
+        await asyncio.gather(*(self.job_loop(name) for name in self.jobs))
+
+def list_jobs(schedules, state_file=STATE_FILE):
+    """Print the jobs with their next run and last result"""
+    state = load_state(state_file)
+    now = datetime.now()
+    for job in schedules:
+        entry = state.get(job['name'], {})
+        print(f"{job['name']:<20} {job['cron']:<16} next: {next_run(parse_cron(job['cron']), now):%Y-%m-%d %H:%M}  "
+              f"last: {entry.get('last_finished', '-')} ({entry.get('last_status', '-')}), "
+              f"{entry.get('runs', 0)} runs, {entry.get('failures', 0)} failed")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the Looker Studio exports on a schedule")
+    parser.add_argument('--list', action='store_true', help="Show the jobs and their next runs")
+    parser.add_argument('--no-catch-up', dest='catch_up', action='store_false', default=CATCH_UP,
+                        help="Do not run slots missed while the scheduler was stopped")
+    args = parser.parse_args()
+    
+    if args.list:
+        list_jobs(SCHEDULES)
+        sys.exit(0)
+    
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler(LOG_FILE, encoding='utf-8'),
+            logging.StreamHandler()
+        ]
+    )
+    
+    try:
+        asyncio.run(Scheduler(SCHEDULES).run(args.catch_up))
+    except KeyboardInterrupt:
+        logging.info("=== Scheduler stopped ===")
@@ -0,0 +1,77 @@
+"""
+Remembers which locator worked, per report, across runs
+The download tries several fallback selectors for the date picker and the
+export menu; the one that worked last time is tried first next time:
+
+    {"https://lookerstudio.google.com/reporting/...": {"start_day": 2, "menu_button": 1, ...}}
+
+Values are indexes into the fallback lists (the selectors themselves contain dates)
+"""
+
+import os
+import json
+import logging
+
+# Locators tried first and right (hits), or not remembered / not working (misses)
+STATS = {'hits': 0, 'misses': 0}
+
+# Cache files already read in this process
+_caches = {}
+
+def load_cache(cache_file):
+    """Load the cache ({report: {key: index}}), read from disk only once"""
+    if cache_file in _caches:
+        return _caches[cache_file]
+    
+    cache = {}
+    if os.path.exists(cache_file):
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+        except Exception as e:
+            logging.warning(f"Could not read selector cache, starting empty: {e}")
+    
+    _caches[cache_file] = cache
+    return cache
+
+def save_cache(cache_file, cache):
+    """Write the cache (via temp file)"""
+    tmp_file = cache_file + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+    os.replace(tmp_file, cache_file)
+
+def ordered(cache_file, report, key, candidates):
+    """(index, candidate) pairs, the one that worked last time first"""
+    remembered = load_cache(cache_file).get(report, {}).get(key)
+    pairs = list(enumerate(candidates))
+    if remembered is not None and 0 <= remembered < len(pairs):
+        pairs.insert(0, pairs.pop(remembered))
+    return pairs
+
+def record(cache_file, report, key, index):
+    """
+    Record the index that worked for key (None = none worked)
+    Counts a hit if it is the remembered one, and saves the cache when it changed
+    """
+    cache = load_cache(cache_file)
+    entry = cache.setdefault(report, {})
+    remembered = entry.get(key)
+    
+    if index is not None and index == remembered:
+        STATS['hits'] += 1
+        return
+    
+    STATS['misses'] += 1
+    logging.info(f"  Selector cache miss for '{key}' (remembered: {remembered}, worked: {index})")
+    if index is not None:
+        entry[key] = index
+        save_cache(cache_file, cache)
+
+def reset_stats():
+    """Start counting hits/misses from zero (e.g. for the next report)"""
+    STATS['hits'] = STATS['misses'] = 0
+
+def log_stats():
+    """Log the hit/miss counts of this process"""
+    logging.info(f"Selector cache: {STATS['hits']} hits, {STATS['misses']} misses")
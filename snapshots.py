@@ -0,0 +1,186 @@
+"""
+Snapshots of the master store (replaces the full Excel backup per run)
+Each week partition is stored once, content-addressed by its SHA-256:
+
+    snapshots/objects/ab/ab12...ef.parquet    (hard link or copy of a partition file)
+    snapshots/20251117_090000.json            (which object belongs to which week)
+
+Partition files are always replaced (never rewritten in place), so a hard
+link keeps the old content alive. A snapshot only costs disk space for
+weeks that changed since the previous snapshot.
+"""
+
+import os
+import json
+import glob
+import shutil
+import logging
+from datetime import datetime
+
+import master_store
+
+def link_or_copy(source, target):
+    """Hard link source to target, or copy it if linking is not possible"""
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+
+def object_path(snapshot_folder, sha256):
+    """Path of a content-addressed object"""
+    return os.path.join(snapshot_folder, "objects", sha256[:2], f"{sha256}.parquet")
+
+def load_hash_index(snapshot_folder):
+    """Cached partition hashes ({partition: {size, mtime_ns, sha256}})"""
+    index_file = os.path.join(snapshot_folder, "object_index.json")
+    if not os.path.exists(index_file):
+        return {}
+    
+    try:
+        with open(index_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        logging.warning(f"Could not read snapshot hash index, rehashing: {e}")
+        return {}
+
+def save_hash_index(snapshot_folder, index):
+    """Write the cached partition hashes"""
+    index_file = os.path.join(snapshot_folder, "object_index.json")
+    tmp_file = index_file + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(index, f, indent=2, sort_keys=True)
+    os.replace(tmp_file, index_file)
+
+def list_snapshots(snapshot_folder):
+    """List snapshot ids, oldest first"""
+    paths = glob.glob(os.path.join(snapshot_folder, "*.json"))
+    return sorted(os.path.basename(path)[:-len(".json")] for path in paths
+                  if os.path.basename(path) != "object_index.json")
+
+def load_snapshot(snapshot_folder, snapshot_id):
+    """Load the manifest of one snapshot"""
+    snapshot_file = os.path.join(snapshot_folder, f"{snapshot_id}.json")
+    if not os.path.exists(snapshot_file):
+        raise FileNotFoundError(f"Snapshot not found: {snapshot_id}")
+    
+    with open(snapshot_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def create_snapshot(store_folder, snapshot_folder, ingest_manifest=None):
+    """
+    Snapshot the current state of the store
+    Only partitions that are not in the object store yet are linked/copied
+    Returns the snapshot id
+    """
+    os.makedirs(snapshot_folder, exist_ok=True)
+    hash_index = load_hash_index(snapshot_folder)
+    new_index = {}
+    
+    partitions = {}
+    new_objects = 0
+    for year, week in master_store.list_partitions(store_folder):
+        key = f"{year}/{week}"
+        partition_file = os.path.join(master_store.partition_dir(store_folder, year, week),
+                                      master_store.PARTITION_FILE)
+        stat = os.stat(partition_file)
+        
+        # Only hash partitions that changed since the last snapshot
+        cached = hash_index.get(key)
+        if cached and cached['size'] == stat.st_size and cached['mtime_ns'] == stat.st_mtime_ns:
+            sha256 = cached['sha256']
+        else:
+            sha256 = master_store.file_hash(partition_file)
+        new_index[key] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': sha256}
+        
+        target = object_path(snapshot_folder, sha256)
+        if not os.path.exists(target):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            link_or_copy(partition_file, target)
+            new_objects += 1
+        
+        partitions[key] = sha256
+    
+    snapshot_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+    if os.path.exists(os.path.join(snapshot_folder, f"{snapshot_id}.json")):
+        # Two snapshots within the same second
+        snapshot_id += datetime.now().strftime("_%f")
+    snapshot = {
+        'id': snapshot_id,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'partitions': partitions,
+        'ingest_manifest': ingest_manifest or {}
+    }
+    
+    snapshot_file = os.path.join(snapshot_folder, f"{snapshot_id}.json")
+    tmp_file = snapshot_file + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(snapshot, f, indent=2, sort_keys=True)
+    os.replace(tmp_file, snapshot_file)
+    
+    save_hash_index(snapshot_folder, new_index)
+    logging.info(f"Snapshot {snapshot_id}: {len(partitions)} weeks, {new_objects} new objects")
+    
+    return snapshot_id
+
+def prune_snapshots(snapshot_folder, keep):
+    """Keep the newest `keep` snapshots and remove objects no snapshot refers to"""
+    snapshot_ids = list_snapshots(snapshot_folder)
+    removed = snapshot_ids[:-keep] if keep > 0 else snapshot_ids
+    
+    for snapshot_id in removed:
+        os.remove(os.path.join(snapshot_folder, f"{snapshot_id}.json"))
+        logging.info(f"Snapshot pruned: {snapshot_id}")
+    
+    # Garbage collect unreferenced objects
+    referenced = set()
+    for snapshot_id in list_snapshots(snapshot_folder):
+        referenced.update(load_snapshot(snapshot_folder, snapshot_id)['partitions'].values())
+    
+    freed = 0
+    for path in glob.glob(os.path.join(snapshot_folder, "objects", "*", "*.parquet")):
+        if os.path.basename(path)[:-len(".parquet")] not in referenced:
+            os.remove(path)
+            freed += 1
+    
+    if freed:
+        logging.info(f"Removed {freed} unreferenced snapshot objects")
+    
+    return removed
+
+def restore_snapshot(store_folder, snapshot_folder, snapshot_id):
+    """
+    Restore the store to the state of a snapshot
+    Returns the ingest manifest that belongs to the snapshot
+    """
+    snapshot = load_snapshot(snapshot_folder, snapshot_id)
+    logging.info(f"Restoring snapshot {snapshot_id} ({len(snapshot['partitions'])} weeks)")
+    
+    restored_weeks = set()
+    for key, sha256 in snapshot['partitions'].items():
+        year, week = (int(part) for part in key.split('/'))
+        source = object_path(snapshot_folder, sha256)
+        if not os.path.exists(source):
+            raise FileNotFoundError(f"Snapshot object missing for week {week}/{year}: {source}")
+        
+        target_dir = master_store.partition_dir(store_folder, year, week)
+        os.makedirs(target_dir, exist_ok=True)
+        target_file = os.path.join(target_dir, master_store.PARTITION_FILE)
+        restored_weeks.add((year, week))
+        
+        # Week is unchanged since the snapshot (already the same file)
+        if os.path.exists(target_file) and os.path.samefile(source, target_file):
+            continue
+        
+        # Link next to the target first, then swap it in
+        tmp_file = target_file + ".tmp"
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        link_or_copy(source, tmp_file)
+        os.replace(tmp_file, target_file)
+    
+    # Weeks added after the snapshot are removed
+    for year, week in master_store.list_partitions(store_folder):
+        if (year, week) not in restored_weeks:
+            master_store.delete_week_partition(store_folder, year, week)
+    
+    return snapshot['ingest_manifest']
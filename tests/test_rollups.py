@@ -0,0 +1,34 @@
+from datetime import date, timedelta
+
+import rollups
+import week_naming
+
+def sundays(first_year, last_year):
+    sunday = date(first_year, 1, 3)
+    while sunday.year <= last_year:
+        yield sunday
+        sunday += timedelta(weeks=1)
+
+def test_every_week_lands_in_the_period_of_its_wednesday():
+    for sunday in sundays(2016, 2027):
+        week, year = week_naming.week_of(sunday)
+        if week_naming.week_sunday(week, year) != sunday:
+            continue  # Name shared with a later week of the same year (see below)
+        wednesday = sunday + timedelta(days=3)
+        assert rollups.week_periods(year, week) == ((wednesday.year, wednesday.month),
+                                                    (wednesday.year, (wednesday.month - 1) // 3 + 1))
+
+def test_year_boundary_weeks():
+    # Sundays on Jan 1-3 are named with the previous year's last ISO week
+    for sunday in (date(2016, 1, 3), date(2021, 1, 3), date(2022, 1, 2), date(2027, 1, 3)):
+        week, year = week_naming.week_of(sunday)
+        assert (year, week >= 52) == (sunday.year, True)
+        assert rollups.week_midpoint(year, week) == sunday + timedelta(days=3)
+        assert rollups.week_periods(year, week) == ((sunday.year, 1), (sunday.year, 1))
+
+def test_shared_week_name_is_the_later_week():
+    # 2023-01-01 and 2023-12-31 are both week 52/2023 - the later download replaces the earlier one
+    assert week_naming.week_of(date(2023, 1, 1)) == week_naming.week_of(date(2023, 12, 31)) == (52, 2023)
+    assert rollups.week_periods(2023, 52) == ((2024, 1), (2024, 1))
+    shared = [sunday for sunday in sundays(2016, 2027) if week_naming.week_sunday(*week_naming.week_of(sunday)) != sunday]
+    assert shared == [date(2017, 1, 1), date(2023, 1, 1)]
@@ -0,0 +1,14 @@
+import pandas as pd
+
+import typed_ingest
+
+def durations(values):
+    return typed_ingest.convert_column(pd.Series(values, dtype='object'), 'duration').tolist()
+
+def test_durations():
+    assert durations(["01:02:03", "02:30", "0:00:10"]) == [3723, 150, 10]
+
+def test_duration_column_without_any_colon():
+    # A week (or a streaming chunk) where the column is blank
+    assert all(pd.isna(value) for value in durations([None, "", None]))
+    assert durations([]) == []
@@ -0,0 +1,143 @@
+"""
+Typed ingest for Looker Studio exports made with "Keep value formatting"
+Values like 1,234.56 / €12.30 / 45.2% / 00:01:23 arrive as text; this module
+infers a kind per column once, caches it in a JSON schema file and converts
+whole columns at once (vectorized string operations, no per-row Python)
+
+Kinds:
+    number    1,234.56     -> 1234.56
+    currency  €12.30       -> 12.3
+    percent   45.2%        -> 0.452 (fraction)
+    duration  01:02:03     -> 3723.0 (seconds; mm:ss is also accepted)
+    text      anything else, kept as is
+"""
+
+import os
+import re
+import json
+import logging
+
+import pandas as pd
+
+NUMERIC_KINDS = ('number', 'currency', 'percent', 'duration')
+CURRENCY_SYMBOLS = "€$£¥"
+
+def kind_patterns(thousands=',', decimal='.'):
+    """Regular expressions (full match) for each kind, for the given separators"""
+    number = rf"[-+]?(?:\d{{1,3}}(?:{re.escape(thousands)}\d{{3}})+|\d+)(?:{re.escape(decimal)}\d+)?"
+    symbol = f"[{CURRENCY_SYMBOLS}]"
+    return {
+        'number': number,
+        'currency': rf"-?\s*{symbol}\s*{number}|{number}\s*{symbol}",
+        'percent': rf"{number}\s*%",
+        'duration': r"\d+:\d{2}(?::\d{2})?",
+    }
+
+def infer_kind(values, patterns):
+    """Infer the kind of one column of text values (None if it is empty)"""
+    values = values.dropna().astype(str).str.strip()
+    values = values[values != '']
+    if values.empty:
+        return None
+    
+    for kind, pattern in patterns.items():
+        if values.str.fullmatch(pattern).all():
+            return kind
+    
+    return 'text'
+
+def infer_schema(df, schema, thousands=',', decimal='.'):
+    """
+    Add the kinds of columns that are not in the schema yet
+    Returns the list of newly inferred columns
+    """
+    patterns = kind_patterns(thousands, decimal)
+    new_columns = []
+    
+    for column in df.columns:
+        if column in schema or column in ('Year', 'Week'):
+            continue
+        
+        kind = infer_kind(df[column], patterns)
+        if kind is None:
+            continue  # No values yet - decide when a week has data
+        
+        schema[column] = kind
+        new_columns.append(column)
+        logging.info(f"  Column '{column}': {kind}")
+    
+    return new_columns
+
+def to_number(values, thousands=',', decimal='.'):
+    """Text like 1,234.56 (after removing symbols) to float"""
+    values = values.str.replace(thousands, '', regex=False)
+    if decimal != '.':
+        values = values.str.replace(decimal, '.', regex=False)
+    return pd.to_numeric(values, errors='coerce')
+
+def to_seconds(values):
+    """Text like hh:mm:ss or mm:ss to seconds (float)"""
+    # Always three parts, also when no value has a ':' (e.g. a blank column or chunk)
+    parts = values.str.split(':', expand=True).reindex(columns=range(3)).apply(pd.to_numeric, errors='coerce')
+    
+    # mm:ss leaves the last part empty: shift it to the right
+    two_parts = parts[2].isna()
+    hours = parts[0].where(~two_parts, 0)
+    minutes = parts[1].where(~two_parts, parts[0])
+    seconds = parts[2].where(~two_parts, parts[1])
+    
+    return hours * 3600 + minutes * 60 + seconds
+
+def convert_column(values, kind, thousands=',', decimal='.'):
+    """Convert one text column to float according to its kind"""
+    values = values.astype('string').str.strip()
+    
+    if kind == 'number':
+        return to_number(values, thousands, decimal)
+    if kind == 'currency':
+        return to_number(values.str.replace(rf"[{CURRENCY_SYMBOLS}\s]", '', regex=True),
+                         thousands, decimal)
+    if kind == 'percent':
+        return to_number(values.str.rstrip('%').str.strip(), thousands, decimal) / 100
+    if kind == 'duration':
+        return to_seconds(values)
+    
+    raise ValueError(f"Unknown column kind: {kind}")
+
+def apply_schema(df, schema, thousands=',', decimal='.'):
+    """Convert all numeric columns of df (in place) according to the schema"""
+    for column in df.columns:
+        kind = schema.get(column)
+        if kind not in NUMERIC_KINDS:
+            continue
+        
+        original = df[column]
+        converted = convert_column(original, kind, thousands, decimal)
+        
+        # Values that do not fit the kind become empty - report them
+        lost = int((converted.isna() & original.notna() & (original.astype(str).str.strip() != '')).sum())
+        if lost:
+            logging.warning(f"  Column '{column}' ({kind}): {lost} values could not be converted")
+        
+        df[column] = converted.astype('float64')
+    
+    return df
+
+def load_schema(schema_file):
+    """Load the cached column schema ({column: kind})"""
+    if not os.path.exists(schema_file):
+        return {}
+    
+    try:
+        with open(schema_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        logging.warning(f"Could not read column schema, inferring again: {e}")
+        return {}
+
+def save_schema(schema_file, schema):
+    """Write the column schema (edit this file to override an inferred kind)"""
+    tmp_file = schema_file + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(schema, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_file, schema_file)
@@ -0,0 +1,26 @@
+"""
+Week names as used in the weekly file names (data_weekXX_YYYY.csv)
+A week runs Sunday to Saturday and is named by the ISO week number of its
+Sunday and the calendar year of its Sunday - so a Sunday on Jan 1-3 gives the
+last ISO week of the previous year with the new year, e.g. 2023-01-01 -> week 52/2023
+"""
+
+from datetime import date
+
+def week_of(sunday):
+    """(week number, year) of the week starting on `sunday`"""
+    return sunday.isocalendar()[1], sunday.year
+
+def week_sunday(week_num, year):
+    """Sunday of a week named (week_num, year)"""
+    # A Sunday on Jan 1-3 belongs to the last ISO week of the previous year
+    # (the year then has two weeks with the same name - the later one wins)
+    for iso_year in (year, year - 1):
+        try:
+            sunday = date.fromisocalendar(iso_year, week_num, 7)
+        except ValueError:
+            continue
+        if sunday.year == year:
+            return sunday
+    
+    raise ValueError(f"No Sunday in week {week_num} of {year}")